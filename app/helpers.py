@@ -1,49 +1,78 @@
+from collections.abc import Collection
+
 from sanic import Request
 
 from . import settings, utils
-from .models import Template
+from .models import REGISTRY, Template
+
+COMPACT_FIELDS = ("id", "name", "lines", "styles")
 
 
 def get_valid_templates(
-    request: Request, query: str = "", animated: bool | None = None
-) -> list[dict]:
-    templates: list[Template] = Template.objects.filter(valid=True, _exclude="_custom")
-    if query:
-        templates = [t for t in templates if t.matches(query)]
-    else:
-        templates = sorted(templates)
-    if animated is True:
-        templates = [t for t in templates if "animated" in t.styles]
-    elif animated is False:
-        templates = [t for t in templates if "animated" not in t.styles]
-    return [template.jsonify(request) for template in templates]
+    request: Request,
+    query: str = "",
+    animated: bool | None = None,
+    *,
+    fields: Collection[str] = (),
+    offset: int = 0,
+    limit: int = 0,
+    cursor: str = "",
+) -> tuple[list[dict], dict[str, str]]:
+    templates = REGISTRY.filter(query, animated=animated)
+    page, next = paginate(templates, offset=offset, limit=limit, cursor=cursor)
+    data = [template.jsonify(request, fields) for template in page]
+    if not (offset or limit or cursor):
+        return data, {}
+    return data, get_page_headers(request, len(templates), next)
+
+
+def paginate(
+    templates: list[Template], *, offset: int = 0, limit: int = 0, cursor: str = ""
+) -> tuple[list[Template], str]:
+    if cursor:
+        ids = [template.id for template in templates]
+        offset = ids.index(cursor) + 1 if cursor in ids else len(ids)
+    end = offset + limit if limit else len(templates)
+    page = templates[offset:end]
+    if page and end < len(templates):
+        return page, page[-1].id
+    return page, ""
+
+
+def get_page_headers(request: Request, total: int, next: str) -> dict[str, str]:
+    headers = {"X-Total-Count": str(total)}
+    if next:
+        # Only parameters in the response cache key, since these headers are cached
+        params = {
+            name: request.args.get(name)
+            for name in ["filter", "animated", "fields", "compact", "limit"]
+            if name in request.args
+        }
+        url = request.app.url_for(
+            "Templates.index",
+            _external=True,
+            _scheme=settings.SCHEME,
+            cursor=next,
+            **params,
+        )
+        headers["Link"] = f'<{url}>; rel="next"'
+    return headers
 
 
 def get_example_images(
     request: Request, query: str = "", *, animated: bool | None = None
 ) -> list[tuple[str, str]]:
-    templates = Template.objects.filter(valid=True, _exclude="_custom")
-    if query:
-        templates = [t for t in templates if t.matches(query)]
-    else:
-        templates = sorted(templates)
-
     if animated is None:
         animated = utils.urls.flag(request, "animated")
-        exact = True
+        templates = REGISTRY.filter(query, animated=animated)
     else:
-        exact = False
+        templates = REGISTRY.filter(query)
 
     images = []
     for template in templates:
-        if exact and animated is True and "animated" not in template.styles:
-            continue
-        if exact and animated is False and "animated" in template.styles:
-            continue
-
         if animated is True:
             extension = settings.DEFAULT_ANIMATED_EXTENSION
-        elif "animated" in template.styles and animated is not False:
+        elif template.animated_image and animated is not False:
             extension = settings.DEFAULT_ANIMATED_EXTENSION
         else:
             extension = settings.DEFAULT_STATIC_EXTENSION
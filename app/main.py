@@ -5,11 +5,40 @@ from sanic.request import Request
 from sanic_ext import openapi
 
 from app import config, helpers, settings, utils
+from app.models import REGISTRY
 
 app = Sanic(name="memegen")
 config.init(app)
 
 
+@app.before_server_start
+async def load_registry(app: Sanic):
+    # Handlers read the registry synchronously, so block startup, not the loop
+    await asyncio.to_thread(REGISTRY.load)
+
+
+@app.after_server_start
+async def warm_up_worker(app: Sanic):
+    # Sanic spawns workers, so each warms up on its own and reports 503 on /ready
+    # until done; gunicorn's when_ready hook warms the preloaded app instead
+    app.add_task(asyncio.to_thread(utils.warmup.run), name="warmup")
+
+
+@app.after_server_start
+async def watch_registry(app: Sanic):
+    app.add_task(REGISTRY.watch(), name="registry")
+
+
+@app.before_server_stop
+async def flush_tracking(app: Sanic):
+    await utils.tracking.stop()
+
+
+@app.before_server_stop
+async def stop_prerender(app: Sanic):
+    await utils.prerender.stop()
+
+
 @app.get("/")
 @openapi.exclude(True)
 def index(request: Request):
@@ -27,6 +56,14 @@ async def test(request: Request):
     return response.html(content)
 
 
+@app.get("/ready")
+@openapi.exclude(True)
+async def ready(request: Request):
+    status = 200 if utils.warmup.STATUS["ready"] else 503
+    data = {**utils.warmup.STATUS, "remote": utils.breakers.metrics()}
+    return response.json(data, status=status)
+
+
 @app.get("/favicon.ico")
 @openapi.exclude(True)
 async def favicon(request: Request):
@@ -1,4 +1,5 @@
 from .font import Font
 from .overlay import Overlay
+from .registry import REGISTRY, Registry
 from .template import Template
 from .text import Text
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+from sanic.log import logger
+
+from .. import settings
+from .search import Index
+from .template import Template
+
+
+class Registry:
+    def __init__(self, directory: Path = settings.TEMPLATES_DIRECTORY):
+        self.directory = directory
+        self.version = 0
+        self._templates: dict[str, Template] = {}
+        self._modified: dict[str, tuple[float, float]] = {}
+        self._index = Index()
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def stale(self) -> bool:
+        elapsed = time.monotonic() - self._checked
+        return not self._checked or elapsed >= settings.REGISTRY_REFRESH_INTERVAL
+
+    def refresh(self, *, force: bool = False) -> bool:
+        if not (self.stale or force):
+            return False
+
+        with self._lock:
+            self._checked = time.monotonic()
+            # Readers keep using the current dict until the new one is swapped in
+            templates = dict(self._templates)
+            seen: set[str] = set()
+            changed = False
+
+            for path in self.directory.glob("*/config.yml"):
+                id = path.parent.name
+                if id.startswith("_"):
+                    continue
+                seen.add(id)
+                if self._modified.get(id) == self._stat(path):
+                    continue
+                self._load(templates, id)
+                self._modified[id] = self._stat(path)
+                changed = True
+
+            for id in set(self._modified) - seen:
+                logger.info(f"Removing template from registry: {id}")
+                self._modified.pop(id)
+                templates.pop(id, None)
+                changed = True
+
+            if changed:
+                templates = {id: templates[id] for id in sorted(templates)}
+                self._index = Index(templates.values())
+                self._templates = templates
+                self.version += 1
+                logger.info(f"Loaded {len(templates)} template(s) into registry")
+
+        return changed
+
+    async def watch(self):
+        while True:
+            await asyncio.sleep(settings.REGISTRY_REFRESH_INTERVAL)
+            await asyncio.to_thread(self.refresh)
+
+    @staticmethod
+    def _load(templates: dict[str, Template], id: str):
+        template = Template.objects.get_or_none(id)
+        if template and template.valid:
+            logger.debug(f"Loading template into registry: {id}")
+            # Cache directory-based properties so records never touch the disk
+            _styles = template.styles
+            _animated_image = template.animated_image
+            templates[id] = template.detach()
+        else:
+            templates.pop(id, None)
+
+    @staticmethod
+    def _stat(path: Path) -> tuple[float, float]:
+        try:
+            return path.stat().st_mtime, path.parent.stat().st_mtime
+        except FileNotFoundError:
+            return 0.0, 0.0
+
+    def get(self, id: str) -> Template | None:
+        self.load()
+        return self._templates.get(id)
+
+    def all(self) -> list[Template]:
+        self.load()
+        return list(self._templates.values())
+
+    def load(self):
+        # Later refreshes run in the background, see watch(), but the first
+        # load must finish (or wait for one in progress) before reading
+        if not self.version:
+            self.refresh(force=True)
+
+    def filter(
+        self, query: str = "", *, animated: bool | None = None
+    ) -> list[Template]:
+        if query:
+            self.load()
+            loaded = self._templates
+            ids = self._index.search(query)
+            templates = [loaded[id] for id in ids if id in loaded]
+        else:
+            templates = self.all()
+        if animated is True:
+            templates = [t for t in templates if t.animated_image]
+        elif animated is False:
+            templates = [t for t in templates if not t.animated_image]
+        return templates
+
+
+REGISTRY = Registry()
@@ -0,0 +1,85 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterable
+
+from .template import Template
+
+WEIGHTS = {"id": 8, "name": 4, "keywords": 2, "example": 1}
+GRAM_SIZE = 3
+
+
+class Index:
+    def __init__(self, templates: Iterable[Template] = ()):
+        self._fields: dict[str, dict[str, str]] = {}
+        self._tokens: dict[str, set[str]] = defaultdict(set)
+        self._grams: dict[str, set[str]] = defaultdict(set)
+        for template in templates:
+            self._add(template)
+        self._vocabulary = sorted(self._tokens)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def _add(self, template: Template):
+        fields = {
+            "id": template.id,
+            "name": template.name.lower(),
+            "keywords": " ".join(line.lower() for line in template.keywords),
+            "example": " ".join(line.lower() for line in template.example),
+        }
+        self._fields[template.id] = fields
+        for text in fields.values():
+            for token in tokenize(text):
+                self._tokens[token].add(template.id)
+            for gram in ngrams(text):
+                self._grams[gram].add(template.id)
+
+    def search(self, query: str) -> list[str]:
+        query = query.lower()
+        words = tokenize(query)
+        prefixed = [self._prefixed(word) for word in words]
+
+        scores: dict[str, int] = {}
+        for id in self._candidates(query):
+            score = 0
+            for name, text in self._fields[id].items():
+                if query not in text:
+                    continue
+                weight = WEIGHTS[name]
+                score += weight
+                if text == query:
+                    score += weight * 2
+                elif text.startswith(query):
+                    score += weight
+            if score:
+                score += sum(1 for ids in prefixed if id in ids)
+                scores[id] = score
+
+        return sorted(scores, key=lambda id: (-scores[id], id))
+
+    def _candidates(self, query: str) -> set[str]:
+        grams = ngrams(query)
+        if not grams:
+            return set(self._fields)
+        postings = sorted((self._grams.get(gram, set()) for gram in grams), key=len)
+        return set.intersection(*postings)
+
+    def _prefixed(self, word: str) -> set[str]:
+        ids: set[str] = set()
+        index = bisect_left(self._vocabulary, word)
+        while index < len(self._vocabulary):
+            token = self._vocabulary[index]
+            if not token.startswith(word):
+                break
+            ids |= self._tokens[token]
+            index += 1
+        return ids
+
+
+def tokenize(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9]+", text)
+
+
+def ngrams(text: str) -> set[str]:
+    return {text[i : i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
@@ -1,8 +1,11 @@
 import asyncio
 import shutil
+from collections.abc import Callable, Collection
 from contextlib import suppress
+from dataclasses import MISSING, fields, is_dataclass
 from functools import cached_property
 from pathlib import Path
+from typing import Any
 
 from anyio import Path as AsyncPath
 from datafiles import datafile, field, frozen
@@ -43,7 +46,7 @@ class Template:
 
     @cached_property
     def valid(self) -> bool:
-        if not settings.DEPLOYED:
+        if not settings.DEPLOYED and hasattr(self, "datafile"):
             self._update_example()
             self.datafile.save()
         return all(
@@ -63,12 +66,12 @@ class Template:
     @cached_property
     def styles(self):
         styles = []
-        for path in self.directory.iterdir():
-            if path.stem[0] in {".", "_"}:
+        for stem, paths in utils.storage.listing(self.directory).items():
+            if stem[0] in {".", "_"}:
                 continue
-            if path.stem not in {"config", "default"}:
-                styles.append(path.stem)
-            elif path.name == "default.gif":
+            if stem not in {"config", "default"}:
+                styles.extend([stem] * len(paths))
+            elif any(path.name == "default.gif" for path in paths):
                 styles.append("animated")
         if styles or self.overlay != [Overlay()]:
             styles.append("default")
@@ -124,11 +127,14 @@ class Template:
             url = style
             style = utils.text.fingerprint(f"{url}{self.overlay}")
 
-        self.directory.mkdir(exist_ok=True)
-        paths: list[Path] = []
-        for path in self.directory.iterdir():
-            if path.stem == style and path.suffix != settings.PLACEHOLDER_SUFFIX:
-                paths.append(path)
+        listing = utils.storage.listing(self.directory)
+        if not listing:
+            self.directory.mkdir(exist_ok=True)
+        paths = [
+            path
+            for path in listing.get(style, [])
+            if path.suffix != settings.PLACEHOLDER_SUFFIX
+        ]
 
         if animated:
             for path in paths:
@@ -151,7 +157,7 @@ class Template:
                     return path
 
         path = self.directory / "default.gif"
-        if path.exists():
+        if path in listing.get("default", []):
             logger.log(level, f"Matched path by default: {path}")
             return path
 
@@ -169,26 +175,32 @@ class Template:
 
         return self.get_image()
 
-    def jsonify(self, request: Request) -> dict:
-        return {
-            "id": self.id,
-            "name": self.name,
-            "lines": len(self.text),
-            "overlays": len(self.overlay) if self.styles else 0,
-            "styles": self.styles,
-            "blank": request.app.url_for(
+    def jsonify(self, request: Request, fields: Collection[str] = ()) -> dict:
+        getters: dict[str, Callable[[], Any]] = {
+            "id": lambda: self.id,
+            "name": lambda: self.name,
+            "lines": lambda: len(self.text),
+            "overlays": lambda: len(self.overlay) if self.styles else 0,
+            "styles": lambda: self.styles,
+            "blank": lambda: request.app.url_for(
                 "Images.detail_blank",
                 template_filename=self.id + settings.DEFAULT_SUFFIX,
                 _external=True,
                 _scheme=settings.SCHEME,
             ),
-            "example": {
+            "example": lambda: {
                 "text": self.example if any(self.example) else [],
                 "url": self.build_example_url(request),
             },
-            "source": self.source,
-            "keywords": self.keywords,
-            "_self": self.build_self_url(request),
+            "source": lambda: self.source,
+            "keywords": lambda: self.keywords,
+            "_self": lambda: self.build_self_url(request),
+        }
+        # Only requested fields are built to skip unneeded URL generation
+        return {
+            name: getter()
+            for name, getter in getters.items()
+            if not fields or name in fields
         }
 
     def build_self_url(self, request: Request) -> str:
@@ -312,7 +324,7 @@ class Template:
                     return cls.objects.get("_error")
 
         id = utils.text.fingerprint(url)
-        template: Template = cls.objects.get_or_create(id, name=url)
+        template = cls.ephemeral(id, name=url)
 
         suffix = Path(str(parsed.path)).suffix
         if not suffix or len(suffix) > 10:
@@ -322,19 +334,41 @@ class Template:
         filename = "default" + suffix
         path = AsyncPath(template.directory) / filename
 
-        if await path.exists() and not settings.DEBUG and not force:
+        exists = await path.exists()
+        if exists and not force and not utils.remote.expired(url):
             logger.info(f"Found background {url} at {path}")
+            utils.storage.touch(template.directory)
             return template
 
+        previous = utils.remote.digest(url)
         logger.info(f"Saving background {url} to {path}")
-        if not await utils.http.download(url, path):
+        source = await utils.remote.fetch(url, force=force)
+        if not source:
+            return template
+
+        if exists and utils.remote.digest(url) == previous:
+            logger.info(f"Background {url} unchanged at {path}")
+            utils.storage.touch(template.directory)
             return template
 
         try:
-            await asyncio.to_thread(utils.images.load, Path(path))
+            await asyncio.to_thread(utils.images.load, source)
         except utils.images.EXCEPTIONS as e:
             logger.error(e)
-            await path.unlink(missing_ok=True)
+            utils.remote.discard(url)
+            return template
+
+        if exists:
+            logger.info(f"Background {url} changed, removing derived images")
+            await asyncio.to_thread(template.clean)
+            await asyncio.to_thread(
+                shutil.rmtree, settings.IMAGES_DIRECTORY / template.id, True
+            )
+
+        await asyncio.to_thread(utils.remote.link, source, Path(path))
+        utils.storage.forget(template.directory)
+        utils.storage.touch(template.directory)
+        await asyncio.to_thread(utils.storage.maybe_evict)
 
         return template
 
@@ -352,60 +386,62 @@ class Template:
         image = self.get_image(animated=animated)
         filename = utils.text.fingerprint(f"{style}{self.overlay}", suffix=image.suffix)
         path = AsyncPath(self.directory) / filename
-        if await path.exists() and not settings.DEBUG and not force:
-            logger.info(f"Found overlay {style} at {path}")
-            return True
-
         urls = style.split(",")
-        logger.info(f"Embedding {len(urls)} overlay image(s) onto {path}")
-        await asyncio.to_thread(shutil.copy, image, path)
-
-        embedded = 0
-        for index, url in enumerate(urls):
-            success = await self._embed(index, url, path, force)
-            if success:
-                embedded += 1
+        unchanged = None
+        if await path.exists() and not force:
+            if not any(utils.remote.expired(url) for url in urls):
+                logger.info(f"Found overlay {style} at {path}")
+                return True
+            unchanged = [utils.remote.digest(url) for url in urls]
 
-        if len(urls) == 1 and not embedded:
-            await path.unlink()
+        logger.info(f"Embedding {len(urls)} overlay image(s) onto {path}")
 
-        return embedded == len(urls)
+        downloads = dict.fromkeys(urls)
+        foregrounds = await asyncio.gather(
+            *(self._download(url, force) for url in downloads)
+        )
+        downloads.update(zip(downloads, foregrounds))
 
-    async def _embed(
-        self, index: int, url: str, background: AsyncPath, force: bool
-    ) -> bool:
-        if url.strip() in {"", "default"}:
+        if unchanged == [utils.remote.digest(url) for url in urls]:
+            logger.info(f"Overlay {style} unchanged at {path}")
             return True
 
-        suffix = Path(str(furl(url).path)).suffix
-        if not suffix:
-            logger.warning(f"Unable to determine image extension: {url}")
-            suffix = ".png"
-
-        filename = utils.text.fingerprint(url, prefix="_embed-", suffix=suffix)
-        foreground = AsyncPath(self.directory) / filename
-
-        if await foreground.exists() and not settings.DEBUG and not force:
-            logger.info(f"Found overlay {url} at {foreground}")
-        else:
-            logger.info(f"Saving overlay {url} to {foreground}")
-            await utils.http.download(url, foreground)
-
-        try:
-            # TODO: Can 'merge' and 'embed' be combined?
-            if background.suffix == ".gif":
-                await asyncio.to_thread(
-                    utils.images.merge, self, index, Path(foreground), Path(background)
-                )
-            else:
-                await asyncio.to_thread(
-                    utils.images.embed, self, index, Path(foreground), Path(background)
-                )
-        except utils.images.EXCEPTIONS as e:
-            logger.error(e)
-            await foreground.unlink(missing_ok=True)
+        overlays: list[tuple[int, Path]] = []
+        for index, url in enumerate(urls):
+            if foreground := downloads.get(url):
+                overlays.append((index, foreground))
+        skipped = sum(1 for url in urls if url.strip() in {"", "default"})
 
-        return await foreground.exists()
+        embedded = 0
+        if overlays:
+            try:
+                if image.suffix == ".gif":
+                    embedded = await asyncio.to_thread(
+                        utils.images.merge, self, overlays, image, Path(path)
+                    )
+                else:
+                    embedded = await asyncio.to_thread(
+                        utils.images.embed, self, overlays, image, Path(path)
+                    )
+            except utils.images.EXCEPTIONS as e:
+                logger.error(e)
+            utils.storage.forget(self.directory)
+
+        if embedded + skipped < len(urls):
+            # Downloads are shared blobs, so drop unreadable ones with their records
+            for url, foreground in downloads.items():
+                if foreground:
+                    try:
+                        await asyncio.to_thread(utils.images.load, foreground)
+                    except utils.images.EXCEPTIONS:
+                        utils.remote.discard(url)
+
+        return embedded + skipped == len(urls)
+
+    async def _download(self, url: str, force: bool) -> Path | None:
+        if url.strip() in {"", "default"}:
+            return None
+        return await utils.remote.fetch(url, force=force)
 
     async def clone(
         self, options: dict, lines: int = 1, style: str = "default", *, animated: bool
@@ -424,13 +460,14 @@ class Template:
             identifiers.extend([layout, str(lines)])
         variant = utils.text.fingerprint("|".join(identifiers), prefix=".")
 
-        template: Template = self.objects.get_or_create(
+        template = self.ephemeral(
             self.id,
             variant,
             name=self.name,
             text=self.text,
             overlay=self.overlay,
         )
+        template.__dict__["directory"] = self.directory
         template.animate(start, stop)
         template.customize(color, center, scale)
         await template.position(layout, lines, style, animated)
@@ -505,17 +542,48 @@ class Template:
                 suffix = settings.DEFAULT_SUFFIX
 
             destination = Path(self.directory) / (source.stem + ".top" + suffix)
-            await asyncio.to_thread(utils.images.pad_top, source, destination)
+            if destination not in utils.storage.listing(self.directory).get(
+                destination.stem, []
+            ):
+                await asyncio.to_thread(utils.images.pad_top, source, destination)
+                utils.storage.forget(self.directory)
             self.layout = "top"
 
     def clean(self):
         for path in self.directory.iterdir():
             if path.stem not in {"config", "default"}:
                 path.unlink()
+        utils.storage.forget(self.directory)
 
     def delete(self):
         if self.directory.exists():
             shutil.rmtree(self.directory)
+        utils.storage.forget(self.directory)
+
+    @classmethod
+    def ephemeral(cls, id: str, variant: str = "", **values) -> "Template":
+        template = object.__new__(cls)
+        values.update(id=id, variant=variant)
+        for f in fields(cls):
+            if f.name in values:
+                value = values[f.name]
+            elif f.default_factory is not MISSING:
+                value = f.default_factory()
+            else:
+                value = f.default
+            object.__setattr__(template, f.name, _copy(value))
+        template.__dict__["directory"] = settings.TEMPLATES_DIRECTORY / id
+        return template
+
+    def detach(self) -> "Template":
+        template = object.__new__(self.__class__)
+        for name in (f.name for f in fields(self)):
+            object.__setattr__(template, name, _copy(getattr(self, name)))
+        template.__dict__["directory"] = self.directory
+        for name in ("valid", "styles", "animated_image", "animated_text", "image"):
+            if name in self.__dict__:
+                template.__dict__[name] = self.__dict__[name]
+        return template
 
     def matches(self, query: str) -> bool:
         keywords = " ".join(line.lower() for line in self.keywords)
@@ -528,3 +596,13 @@ class Template:
                 query in example,
             )
         )
+
+
+def _copy(value):
+    if is_dataclass(value) and not isinstance(value, type):
+        return value.__class__(
+            **{f.name: _copy(getattr(value, f.name)) for f in fields(value)}
+        )
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
@@ -25,6 +25,9 @@ else:  # localhost
 BASE_URL = f"{SCHEME}://{SERVER_NAME}"
 DEPLOYED = RELEASE_STAGE != "local" and not DEBUG
 
+# Serve non-canonical image URLs with a Content-Location header when disabled
+CANONICAL_REDIRECTS = os.environ.get("CANONICAL_REDIRECTS", "true") == "true"
+
 # Fonts
 
 DEFAULT_FONT = "thick"
@@ -47,10 +50,43 @@ PLACEHOLDER_SUFFIX = ".img"
 PREVIEW_SIZE = (300, 300)
 DEFAULT_SIZE = (600, 600)
 
+# Snap width- or height-only sizes up to this ladder when set, e.g. "300,600,1200"
+SIZE_BUCKETS = sorted(
+    int(value) for value in os.getenv("SIZE_BUCKETS", "").split(",") if value
+)
+
 MAXIMUM_PIXELS = 1920 * 1080
 MAXIMUM_FRAMES = 20
 MINIMUM_FRAMES = 5
 
+PACK_PATH = ROOT / "assets" / "templates.pack"
+RENDITIONS_DIRECTORY = ROOT / "assets" / "renditions"
+RENDITIONS_SCALE = 2
+EXAMPLES_DIRECTORY = ROOT / "assets" / "examples"
+
+# Render generated image URLs in the background before they are requested
+PRERENDER = os.getenv("PRERENDER", "false") == "true"
+PRERENDER_QUEUE_SIZE = int(os.getenv("PRERENDER_QUEUE_SIZE", "100"))
+
+# Templates
+
+TEMPLATES_DIRECTORY = ROOT / "templates"
+
+REGISTRY_REFRESH_INTERVAL = 1 if DEBUG else 60
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+
+WARMUP_BACKGROUNDS = int(os.getenv("WARMUP_BACKGROUNDS", "50"))
+WARMUP_EXAMPLES = os.getenv("WARMUP_EXAMPLES", "false") == "true"
+
+# Custom templates
+
+CUSTOM_TEMPLATES_QUOTA = int(os.getenv("CUSTOM_TEMPLATES_QUOTA_MB", "1024")) * 1024**2
+CUSTOM_TEMPLATES_GRACE = 60 * 10
+CUSTOM_TEMPLATES_EVICTION_INTERVAL = 60
+
+DOWNLOADS_DIRECTORY = ROOT / "downloads"
+REMOTE_IMAGES_TTL = 0 if DEBUG else int(os.getenv("REMOTE_IMAGES_TTL", "86400"))
+
 # Watermarks
 
 DISABLED_WATERMARK = "none"
@@ -136,7 +172,29 @@ TEST_IMAGES = [
 TRACK_REQUESTS = True
 REMOTE_TRACKING_URL = os.getenv("REMOTE_TRACKING_URL")
 
-REMOTE_TRACKING_ERRORS = 0
+REMOTE_TRACKING_TIMEOUT = float(os.getenv("REMOTE_TRACKING_TIMEOUT", "2"))
 REMOTE_TRACKING_ERRORS_LIMIT = int(os.getenv("REMOTE_TRACKING_ERRORS_LIMIT", "10"))
+REMOTE_TRACKING_ERRORS_RATE = float(os.getenv("REMOTE_TRACKING_ERRORS_RATE", "0.5"))
+REMOTE_TRACKING_WINDOW = float(os.getenv("REMOTE_TRACKING_WINDOW", "60"))
+REMOTE_TRACKING_COOLDOWN = float(os.getenv("REMOTE_TRACKING_COOLDOWN", "30"))
+
+REMOTE_TRACKING_BATCH_SIZE = int(os.getenv("REMOTE_TRACKING_BATCH_SIZE", "50"))
+REMOTE_TRACKING_QUEUE_SIZE = int(os.getenv("REMOTE_TRACKING_QUEUE_SIZE", "1000"))
+REMOTE_TRACKING_FLUSH_INTERVAL = float(os.getenv("REMOTE_TRACKING_FLUSH_INTERVAL", "5"))
+
+AUTH_CACHE_TTL = int(os.getenv("AUTH_CACHE_TTL", "900" if DEPLOYED else "5"))
+AUTH_CACHE_NEGATIVE_TTL = int(
+    os.getenv("AUTH_CACHE_NEGATIVE_TTL", "60" if DEPLOYED else "5")
+)
+AUTH_CACHE_PATH = os.getenv("AUTH_CACHE_PATH")  # shared by workers when set
+
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "300" if DEPLOYED else "5"))
 
 BUGSNAG_API_KEY = os.getenv("BUGSNAG_API_KEY")
+
+# Signed URLs
+
+SIGNING_KEYS = dict(  # "<key_id>:<secret>,..." with the current key first
+    item.split(":", 1) for item in os.getenv("SIGNING_KEYS", "").split(",") if item
+)
+SIGNING_TTL = int(os.getenv("SIGNING_TTL", str(60 * 60 * 24 * 30)))
@@ -1,4 +1,4 @@
-from .. import settings
+from .. import settings, utils
 
 
 def describe_index():
@@ -29,3 +29,19 @@ def describe_test():
         expect(response.status) == 200
         expect(response.text.count("img")) > 5
         expect(response.text.count("img")) < 100
+
+
+def describe_ready():
+    def it_reports_warmup_status(expect, client):
+        utils.warmup.run()
+        request, response = client.get("/ready")
+        expect(response.status) == 200
+        expect(response.json["ready"]) == True
+        expect(response.json["templates"]) > 100
+
+    def it_is_unavailable_until_warm(expect, client, monkeypatch):
+        monkeypatch.setattr(utils.warmup, "STATUS", {"ready": False})
+        monkeypatch.setattr(utils.warmup, "run", lambda: utils.warmup.STATUS)
+        request, response = client.get("/ready")
+        expect(response.status) == 503
+        expect(response.json["ready"]) == False
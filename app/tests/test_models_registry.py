@@ -0,0 +1,87 @@
+import asyncio
+import os
+from contextlib import suppress
+
+import pytest
+
+from .. import settings
+from ..models import Registry
+
+
+@pytest.fixture(scope="module")
+def registry():
+    registry = Registry()
+    registry.refresh(force=True)
+    return registry
+
+
+def describe_registry():
+    def it_loads_valid_templates(expect, registry):
+        ids = [template.id for template in registry.all()]
+        expect(ids).contains("fry")
+        expect(ids) == sorted(ids)
+        expect([id for id in ids if id.startswith("_")]) == []
+
+    def it_stores_detached_records(expect, registry):
+        template = registry.get("fry")
+        expect(template.name) == "Futurama Fry"
+        expect(hasattr(template, "datafile")) == False
+
+    def it_returns_none_for_unknown_templates(expect, registry):
+        expect(registry.get("unknown")) == None
+
+    def describe_filter():
+        def it_matches_queries(expect, registry):
+            ids = [template.id for template in registry.filter("fry")]
+            expect(ids).contains("fry")
+
+        def it_limits_animated_templates(expect, registry):
+            animated = registry.filter(animated=True)
+            static = registry.filter(animated=False)
+            expect(len(animated) + len(static)) == len(registry.all())
+            expect(all(t.animated_image for t in animated)) == True
+
+    def describe_refresh():
+        def it_skips_unchanged_templates(expect, registry):
+            registry.refresh(force=True)
+            expect(registry.refresh(force=True)) == False
+
+        def it_reloads_modified_templates(expect, registry):
+            version = registry.version
+            path = registry.directory / "fry" / "config.yml"
+            stat = path.stat()
+            os.utime(path, (stat.st_atime, stat.st_mtime + 1))
+            try:
+                expect(registry.refresh(force=True)) == True
+                expect(registry.version) == version + 1
+            finally:
+                os.utime(path, (stat.st_atime, stat.st_mtime))
+                registry.refresh(force=True)
+
+        @pytest.mark.asyncio
+        async def it_refreshes_in_the_background(expect, registry, monkeypatch):
+            monkeypatch.setattr(settings, "REGISTRY_REFRESH_INTERVAL", 0.01)
+            version = registry.version
+            templates = registry._templates
+            path = registry.directory / "fry" / "config.yml"
+            stat = path.stat()
+            os.utime(path, (stat.st_atime, stat.st_mtime + 1))
+            task = asyncio.create_task(registry.watch())
+            try:
+                for _attempt in range(100):
+                    await asyncio.sleep(0.01)
+                    if registry.version > version:
+                        break
+                expect(registry.version) > version
+                expect(registry._templates).is_not(templates)
+                expect(templates).contains("fry")
+            finally:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+                os.utime(path, (stat.st_atime, stat.st_mtime))
+                registry.refresh(force=True)
+
+    def it_loads_lazily_on_first_use(expect):
+        registry = Registry()
+        expect(registry.get("fry")) != None
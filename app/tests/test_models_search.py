@@ -0,0 +1,49 @@
+import pytest
+
+from ..models import Registry
+from ..models.search import Index, ngrams
+
+
+@pytest.fixture(scope="module")
+def templates():
+    return Registry().all()
+
+
+@pytest.fixture(scope="module")
+def index(templates):
+    return Index(templates)
+
+
+def describe_index():
+    def it_ranks_exact_ids_first(expect, index):
+        expect(index.search("fry")[0]) == "fry"
+
+    def it_ranks_name_prefixes_above_examples(expect, index):
+        ids = index.search("insanity")
+        expect(ids[0]) == "iw"
+
+    def it_matches_substrings(expect, index):
+        expect(index.search("awesome")) == index.search("AWESOME")
+        expect(len(index.search("awesome"))) == 3
+
+    def it_matches_text_across_words(expect, index):
+        expect(index.search("does testing")).contains("iw")
+
+    def it_matches_short_queries(expect, index):
+        expect(index.search("iw")).contains("iw")
+
+    def it_returns_nothing_for_unknown_queries(expect, index):
+        expect(index.search("xyzzy")) == []
+
+    def it_matches_the_same_templates_as_a_scan(expect, templates, index):
+        for query in ["a", "the", "cat", "does test", "wolf"]:
+            expected = sorted(t.id for t in templates if t.matches(query))
+            expect(sorted(index.search(query))) == expected
+
+
+def describe_ngrams():
+    def it_splits_text_into_trigrams(expect):
+        expect(ngrams("fry!")) == {"fry", "ry!"}
+
+    def it_ignores_short_text(expect):
+        expect(ngrams("iw")) == set()
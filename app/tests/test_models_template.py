@@ -1,9 +1,12 @@
+import asyncio
 from pathlib import Path
 
+import anyio
 import datafiles
 import pytest
 from sanic.log import logger
 
+from .. import settings, utils
 from ..models import Overlay, Template, Text
 
 
@@ -128,6 +131,30 @@ def describe_template():
             template = await Template.create(url)
             expect(template.id) == "fry"
 
+        @pytest.mark.asyncio
+        async def it_picks_up_changed_backgrounds(expect, monkeypatch):
+            sources = ["iw", "fry"]
+
+            async def download(url, path, headers=None):
+                source = settings.TEMPLATES_DIRECTORY / sources[0] / "default.png"
+                await anyio.Path(path).write_bytes(source.read_bytes())
+                return 200, {}
+
+            monkeypatch.setattr(utils.http, "download", download)
+            url = "http://example.com/changing-background.png"
+            template = await Template.create(url, force=True)
+            derived = template.directory / "default.top.png"
+            derived.touch()
+
+            sources.pop(0)
+            monkeypatch.setattr(settings, "REMOTE_IMAGES_TTL", 0)
+            template = await Template.create(url)
+
+            expect(template.image.read_bytes()) == (
+                settings.TEMPLATES_DIRECTORY / "fry" / "default.png"
+            ).read_bytes()
+            expect(derived.exists()) == False
+
     def describe_check():
         @pytest.mark.asyncio
         async def it_determines_overlay_file_extension(expect):
@@ -151,3 +178,87 @@ def describe_template():
             style = "default,https://www.gstatic.com/webp/gallery/1.jpg"
             template = Template.objects.get("perfection")
             expect(await template.check(style)) == True
+
+        @pytest.mark.asyncio
+        async def it_downloads_each_overlay_once_concurrently(
+            expect, monkeypatch, tmp_path
+        ):
+            calls = []
+            active = [0, 0]
+
+            async def download(url, path, headers=None):
+                calls.append(url)
+                active[0] += 1
+                active[1] = max(active)
+                await asyncio.sleep(0.01)
+                active[0] -= 1
+                source = settings.TEMPLATES_DIRECTORY / "iw" / "default.png"
+                await anyio.Path(path).write_bytes(source.read_bytes())
+                return 200, {}
+
+            monkeypatch.setattr(utils.http, "download", download)
+            style = ",".join(
+                [
+                    "http://example.com/overlay-1.png",
+                    "default",
+                    "http://example.com/overlay-2.png",
+                    "http://example.com/overlay-1.png",
+                ]
+            )
+            template: Template = Template.objects.get("same")
+            expect(await template.check(style, force=True)) == True
+            expect(sorted(calls)) == [
+                "http://example.com/overlay-1.png",
+                "http://example.com/overlay-2.png",
+            ]
+            expect(active[1]) == 2
+
+        @pytest.mark.asyncio
+        async def it_discards_unreadable_overlays(expect, monkeypatch, tmp_path):
+            monkeypatch.setattr(settings, "DOWNLOADS_DIRECTORY", tmp_path)
+
+            async def download(url, path, headers=None):
+                await anyio.Path(path).write_bytes(b"not an image")
+                return 200, {}
+
+            monkeypatch.setattr(utils.http, "download", download)
+            url = "http://example.com/broken.png"
+            template: Template = Template.objects.get("same")
+            expect(await template.check(url, force=True)) == False
+            expect(utils.remote.read(url)) == {}
+            expect(list(tmp_path.glob("blobs/*/*"))) == []
+
+    def describe_clone():
+        @pytest.mark.asyncio
+        async def it_creates_variants_in_memory(expect):
+            template = Template.objects.get("iw")
+            before = sorted(template.directory.glob("config*.yml"))
+
+            variant = await template.clone(
+                {"color": "red,blue", "center": "0.1,0.2"}, animated=False
+            )
+
+            expect(variant.variant) != ""
+            expect(variant.directory) == template.directory
+            expect([text.color for text in variant.text][:2]) == ["red", "blue"]
+            expect(variant.overlay[0].center_x) == 0.1
+            expect(template.text[0].color) == "white"
+            expect(sorted(template.directory.glob("config*.yml"))) == before
+
+        @pytest.mark.asyncio
+        async def it_does_not_save_variants_when_validated(expect, monkeypatch):
+            monkeypatch.setattr(settings, "DEPLOYED", False)
+            template = Template.objects.get("iw")
+            variant = await template.clone({"start": "0.1"}, animated=False)
+            expect(variant.valid) == True
+            expect(hasattr(variant, "datafile")) == False
+
+    def describe_ephemeral():
+        def it_uses_default_values(expect):
+            template = Template.ephemeral("_custom-ephemeral", name="Example")
+            expect(template.name) == "Example"
+            expect(template.text) == [Text(), Text(anchor_x=0.0, anchor_y=0.8)]
+            expect(template.directory) == (
+                settings.TEMPLATES_DIRECTORY / "_custom-ephemeral"
+            )
+            expect(template.directory.exists()) == False
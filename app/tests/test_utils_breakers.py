@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from .. import settings
+from ..utils.breakers import Breaker
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    monkeypatch.setattr(settings, "REMOTE_TRACKING_ERRORS_LIMIT", 2)
+    monkeypatch.setattr(settings, "REMOTE_TRACKING_ERRORS_RATE", 0.5)
+    monkeypatch.setattr(settings, "REMOTE_TRACKING_COOLDOWN", 30)
+    return Breaker("test")
+
+
+def describe_breaker():
+    def it_stays_closed_below_the_failure_rate(expect, breaker):
+        for success in [True, True, True, False, False]:
+            breaker.record(success)
+        expect(breaker.state) == "closed"
+        expect(breaker.allow()) == True
+
+    def it_opens_after_enough_failures(expect, breaker):
+        breaker.record(False)
+        breaker.record(False)
+        expect(breaker.state) == "open"
+        expect(breaker.allow()) == False
+        expect(breaker.counts["rejected"]) == 1
+
+    def it_forgets_failures_outside_the_window(expect, breaker, monkeypatch):
+        breaker.record(False)
+        later = time.monotonic() + settings.REMOTE_TRACKING_WINDOW + 1
+        monkeypatch.setattr(time, "monotonic", lambda: later)
+        breaker.record(False)
+        expect(breaker.state) == "closed"
+
+    def describe_half_open():
+        @pytest.fixture
+        def probing(breaker, monkeypatch):
+            breaker.record(False)
+            breaker.record(False)
+            later = time.monotonic() + settings.REMOTE_TRACKING_COOLDOWN + 1
+            monkeypatch.setattr(time, "monotonic", lambda: later)
+            return breaker
+
+        def it_allows_a_single_probe(expect, probing):
+            expect(probing.allow()) == True
+            expect(probing.state) == "half-open"
+            expect(probing.allow()) == False
+
+        def it_closes_after_a_successful_probe(expect, probing):
+            probing.allow()
+            probing.record(True)
+            expect(probing.state) == "closed"
+
+        def it_reopens_after_a_failed_probe(expect, probing):
+            probing.allow()
+            probing.record(False)
+            expect(probing.state) == "open"
+            expect(probing.counts["opened"]) == 2
+
+        def it_allows_another_probe_after_a_release(expect, probing):
+            probing.allow()
+            probing.release()
+            expect(probing.state) == "half-open"
+            expect(probing.allow()) == True
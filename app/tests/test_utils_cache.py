@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+import pytest
+
+from ..utils.cache import Cache
+
+
+def describe_cache():
+    def it_returns_misses_for_unknown_keys(expect):
+        cache = Cache("test")
+        expect(cache.get("foo")) == (False, None)
+
+    def it_returns_values_until_they_expire(expect, monkeypatch):
+        cache = Cache("test")
+        cache.set("foo", {"bar": 1}, ttl=10)
+        expect(cache.get("foo")) == (True, {"bar": 1})
+
+        monkeypatch.setattr(time, "time", lambda: float("inf"))
+        expect(cache.get("foo")) == (False, None)
+
+    def it_shares_values_through_a_database(expect, tmp_path):
+        Cache("test", tmp_path / "cache.db").set("foo", ["bar"], ttl=10)
+        cache = Cache("test", tmp_path / "cache.db")
+        expect(cache.get("foo")) == (True, ["bar"])
+        expect(Cache("other", tmp_path / "cache.db").get("foo")) == (False, None)
+
+    def it_can_be_cleared(expect, tmp_path):
+        cache = Cache("test", tmp_path / "cache.db")
+        cache.set("foo", "bar", ttl=10)
+        cache.clear()
+        expect(cache.get("foo")) == (False, None)
+
+    @pytest.mark.asyncio
+    async def it_reads_the_database_in_a_thread(expect, tmp_path, monkeypatch):
+        await Cache("test", tmp_path / "cache.db").store("foo", "bar", ttl=10)
+        calls = []
+        to_thread = asyncio.to_thread
+
+        async def counted(function, *args):
+            calls.append(function.__name__)
+            return await to_thread(function, *args)
+
+        monkeypatch.setattr(asyncio, "to_thread", counted)
+        cache = Cache("test", tmp_path / "cache.db")
+        expect(await cache.fetch("foo")) == (True, "bar")
+        expect(await cache.fetch("foo")) == (True, "bar")
+        expect(calls) == ["_read"]
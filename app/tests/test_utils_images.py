@@ -6,6 +6,7 @@ import os
 from pathlib import Path
 
 import pytest
+from PIL import ExifTags, Image, ImageSequence
 
 from .. import models, settings, utils
 
@@ -89,6 +90,14 @@ def test_large_padding(images, template):
     utils.images.save(template, lines, size=(2000, 2000), directory=images)
 
 
+def test_blank_images_match_full_renders(expect, tmp_path, template):
+    for size in [(0, 0), (300, 0), (300, 500)]:
+        path = utils.images.blank(template, size=size, directory=tmp_path / "blank")
+        other = utils.images.save(template, [], size=size, directory=tmp_path)
+        expect(path.name) == other.name
+        expect(Image.open(path).tobytes()) == Image.open(other).tobytes()
+
+
 # Templates
 
 
@@ -154,6 +163,49 @@ async def test_custom_style_rotated(images):
     utils.images.save(template, [], style=style, directory=images)
 
 
+def test_multiple_overlays(expect, images):
+    template = models.Template.objects.get("same")
+    foregrounds = [
+        (0, settings.TEMPLATES_DIRECTORY / "iw" / "default.png"),
+        (1, settings.TEMPLATES_DIRECTORY / "fry" / "default.png"),
+    ]
+    path = images / "multiple-overlays.jpg"
+    expect(utils.images.embed(template, foregrounds, template.image, path)) == 2
+    expect(path.exists()) == True
+
+
+def test_multiple_overlays_on_animated_background(expect, images):
+    template = models.Template.objects.get("fry")
+    foregrounds = [(0, settings.TEMPLATES_DIRECTORY / "iw" / "default.png")]
+    path = images / "multiple-overlays.gif"
+    background = template.get_image(animated=True)
+    expect(utils.images.merge(template, foregrounds, background, path)) == 1
+    expect(path.exists()) == True
+
+
+def test_overlay_on_animated_background_is_identical_per_frame(expect, tmp_path):
+    template = models.Template.objects.get("fry")
+    background = tmp_path / "background.gif"
+    frames = [Image.new("RGB", (200, 200), color) for color in ["blue", "green"]]
+    frames[0].save(
+        background, save_all=True, append_images=frames[1:], duration=[50, 70], loop=3
+    )
+    foreground = tmp_path / "foreground.png"
+    Image.new("RGB", (100, 100), "red").save(foreground)
+    path = tmp_path / "merged.gif"
+
+    utils.images.merge(template, [(0, foreground)], background, path)
+
+    merged = Image.open(path)
+    expect(getattr(merged, "n_frames", 1)) == 2
+    expect(merged.info["loop"]) == 3
+    x1, y1, x2, y2 = template.overlay[0].get_box(merged.size)
+    center = (x1 + x2) // 2, (y1 + y2) // 2
+    for frame, duration in zip(ImageSequence.Iterator(merged), [50, 70]):
+        expect(frame.info["duration"]) == duration
+        expect(frame.convert("RGB").getpixel(center)) == (255, 0, 0)
+
+
 # Text
 
 
@@ -321,3 +373,96 @@ def test_deployed_images(images, monkeypatch):
 
     monkeypatch.delattr(utils.images, "render_image")
     utils.images.save(template, lines, directory=images)
+
+
+# Caching
+
+
+def test_font_aliases_share_a_path(expect, tmp_path, template):
+    lines = ["font", "alias"]
+    path = utils.images.save(template, lines, font_name="thick", directory=tmp_path)
+    expect(
+        utils.images.save(template, lines, font_name="titilliumweb", directory=tmp_path)
+    ) == path
+
+
+def test_default_styles_share_a_path(expect, tmp_path, template):
+    lines = ["default", "style"]
+    path = utils.images.save(template, lines, directory=tmp_path)
+    expect(utils.images.save(template, lines, style="", directory=tmp_path)) == path
+
+
+def test_default_sizes_share_a_path(expect, tmp_path, template):
+    lines = ["default", "size"]
+    paths = {
+        utils.images.save(template, lines, size=size, directory=tmp_path)
+        for size in [(0, 0), settings.DEFAULT_SIZE, (600, 0), (0, 600)]
+    }
+    expect(len(paths)) == 3
+    expect(paths).contains(utils.images.save(template, lines, directory=tmp_path))
+
+
+def test_dimensions_match_decoded_images(expect, tmp_path):
+    path = tmp_path / "rotated.jpg"
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = 6
+    Image.new("RGB", (40, 30)).save(path, exif=exif)
+    expect(utils.images.get_dimensions(path)) == (30, 40)
+    expect(utils.images.get_dimensions(path)) == utils.images.load(path).size
+
+
+def test_frames_are_counted_once_per_file(expect, tmp_path, monkeypatch):
+    path = tmp_path / "animated.gif"
+    frames = [Image.new("RGB", (40, 30), color) for color in ["red", "blue"]]
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+    expect(utils.images.get_frames(path)) == ((40, 30), 2)
+
+    monkeypatch.setattr(Image, "open", None)
+    expect(utils.images.get_frames(path)) == ((40, 30), 2)
+
+
+def test_static_images_ignore_frame_limits(expect, tmp_path, template):
+    lines = ["static", "frames"]
+    path = utils.images.save(template, lines, directory=tmp_path)
+    expect(
+        utils.images.save(template, lines, maximum_frames=5, directory=tmp_path)
+    ) == path
+
+
+def test_size_buckets_share_a_path(expect, tmp_path, template, monkeypatch):
+    monkeypatch.setattr(settings, "SIZE_BUCKETS", [300, 600])
+    lines = ["size", "buckets"]
+    path = utils.images.save(template, lines, size=(300, 0), directory=tmp_path)
+    expect(
+        utils.images.save(template, lines, size=(250, 0), directory=tmp_path)
+    ) == path
+    expect(Image.open(path).size[0]) == 300
+
+
+def test_size_buckets_derive_from_masters(expect, tmp_path, template, monkeypatch):
+    monkeypatch.setattr(settings, "SIZE_BUCKETS", [300, 600])
+    lines = ["size", "buckets"]
+    utils.images.save(template, lines, size=(600, 0), directory=tmp_path)
+
+    monkeypatch.delattr(utils.images, "render_image")
+    path = utils.images.save(template, lines, size=(300, 0), directory=tmp_path)
+    expect(Image.open(path).size[0]) == 300
+
+
+@pytest.mark.slow
+def test_size_buckets_derive_animations(expect, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SIZE_BUCKETS", [300, 600])
+    template = models.Template.objects.get("oprah")
+    lines = ["size", "buckets"]
+    master = utils.images.save(
+        template, lines, extension="gif", size=(600, 0), directory=tmp_path
+    )
+
+    monkeypatch.delattr(utils.images, "render_animation")
+    path = utils.images.save(
+        template, lines, extension="gif", size=(300, 0), directory=tmp_path
+    )
+    image = Image.open(path)
+    expect(image.size[0]) == 300
+    frames = getattr(Image.open(master), "n_frames", 1)
+    expect(getattr(image, "n_frames", 1)) == frames
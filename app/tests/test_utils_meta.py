@@ -1,3 +1,8 @@
+import asyncio
+import re
+import time
+from contextlib import suppress
+
 import pytest
 
 from .. import settings, utils
@@ -29,6 +34,27 @@ def describe_authenticate():
             response = await utils.meta.authenticate(request)
             expect(response) == {"email": "user@example.com"}
 
+    @pytest.mark.asyncio
+    async def it_caches_payloads_by_api_key(expect, monkeypatch, request):
+        monkeypatch.setattr(settings, "REMOTE_TRACKING_URL", "http://example.com/")
+        request.args = {}
+
+        from aioresponses import aioresponses
+
+        with aioresponses() as patched_session:
+            patched_session.get(
+                "http://example.com/auth",
+                payload={"email": "cached@example.com"},
+            )
+
+            request.headers = {"x-api-key": "cached", "user-agent": "foo"}
+            response = await utils.meta.authenticate(request)
+            expect(response) == {"email": "cached@example.com"}
+
+            request.headers = {"x-api-key": "cached", "user-agent": "bar"}
+            response = await utils.meta.authenticate(request)
+            expect(response) == {"email": "cached@example.com"}
+
 
 def describe_tokenize():
     @pytest.mark.asyncio
@@ -63,15 +89,65 @@ def describe_tokenize():
 
 def describe_track():
     @pytest.mark.asyncio
-    async def it_is_disabled_automatically_after_error(expect, monkeypatch, request):
+    async def it_opens_the_circuit_after_errors(expect, monkeypatch, request):
         monkeypatch.setattr(settings, "REMOTE_TRACKING_URL", "http://example.com/404")
         monkeypatch.setattr(settings, "REMOTE_TRACKING_ERRORS_LIMIT", 1)
+        monkeypatch.setattr(utils.breakers, "BREAKERS", {})
         request.args = {}
         request.headers = {}
         request.host = "example.com"
         request.url = "http://example.com"
 
-        await utils.meta.track(request, ["foobar"])
-        await utils.meta.track(request, ["foobar"])
+        utils.meta.track(request, ["foobar"])
+        utils.meta.track(request, ["foobar"])
+        await utils.tracking.stop()
+
+        expect(utils.breakers.get("track").state) == "open"
+
+
+def describe_request():
+    @pytest.mark.asyncio
+    async def it_releases_cancelled_probes(expect, monkeypatch):
+        monkeypatch.setattr(utils.breakers, "BREAKERS", {})
+        breaker = utils.breakers.get("auth")
+        breaker._open(time.monotonic() - settings.REMOTE_TRACKING_COOLDOWN - 1)
+
+        from aioresponses import aioresponses
+
+        async def hang(url, **kwargs):
+            await asyncio.sleep(10)
+
+        with aioresponses() as patched_session:
+            patched_session.get("http://example.com/auth", callback=hang)
+            task = asyncio.create_task(
+                utils.meta._request("auth", "GET", "http://example.com/auth")
+            )
+            await asyncio.sleep(0.1)
+            expect(breaker.state) == "half-open"
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+        expect(breaker.allow()) == True
+
+
+def describe_search():
+    @pytest.mark.asyncio
+    async def it_caches_results_by_query(expect, monkeypatch, request):
+        monkeypatch.setattr(settings, "REMOTE_TRACKING_URL", "http://example.com/")
+        request.args = {}
+        request.headers = {}
+
+        from aioresponses import aioresponses
+
+        with aioresponses() as patched_session:
+            patched_session.get(
+                re.compile(r"http://example.com/results\?.*"),
+                payload=[{"image_url": "http://example.com/foobar.png"}],
+            )
+
+            results = await utils.meta.search(request, "cached", True, mode="results")
+            expect(len(results)) == 1
 
-        expect(settings.TRACK_REQUESTS) == False
+            results = await utils.meta.search(request, "cached", True, mode="results")
+            expect(len(results)) == 1
@@ -0,0 +1,61 @@
+import shutil
+
+import pytest
+from PIL import Image
+
+from .. import settings, utils
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ROOT", tmp_path)
+    monkeypatch.setattr(settings, "PACK_PATH", tmp_path / "assets" / "templates.pack")
+    monkeypatch.setattr(utils.pack, "_pack", None)
+    for id in ["iw", "fry"]:
+        directory = tmp_path / "templates" / id
+        directory.mkdir(parents=True)
+        shutil.copy(settings.TEMPLATES_DIRECTORY / id / "default.png", directory)
+        (directory / "config.yml").touch()
+    utils.pack.build(settings.PACK_PATH, tmp_path / "templates")
+    return tmp_path
+
+
+def describe_build():
+    def it_packs_template_backgrounds(expect, root):
+        pack = utils.pack.Pack(settings.PACK_PATH)
+        expect(sorted(pack.index)) == [
+            "templates/fry/default.png",
+            "templates/iw/default.png",
+        ]
+
+
+def describe_load():
+    def it_returns_decoded_backgrounds(expect, root):
+        background = root / "templates" / "iw" / "default.png"
+        image = utils.images.load(background)
+        expect(image.readonly) == True
+        expect(image.size) == Image.open(background).size
+        expect(image.tobytes()) == utils.pack.decode(background).tobytes()
+
+    def it_ignores_changed_backgrounds(expect, root):
+        background = root / "templates" / "iw" / "default.png"
+        background.write_bytes(background.read_bytes() + b"\0")
+        expect(utils.images.load(background).readonly) == False
+
+    def it_copies_backgrounds_before_changes(expect, root):
+        background = root / "templates" / "fry" / "default.png"
+        image = utils.images.load(background)
+        image.paste((0, 0, 0, 255), (0, 0, 10, 10))
+        expect(utils.images.load(background).getpixel((0, 0))) != (0, 0, 0, 255)
+
+
+def describe_select():
+    def it_prefers_packed_backgrounds_over_renditions(expect, root, monkeypatch):
+        monkeypatch.setattr(settings, "RENDITIONS_DIRECTORY", root / "renditions")
+        background = root / "templates" / "iw" / "default.png"
+        utils.renditions.build(background.parent)
+        expect(utils.renditions.lookup(background)) != []
+        selected = utils.images.select(
+            background, settings.PREVIEW_SIZE, False, expand=True
+        )
+        expect(selected) == background
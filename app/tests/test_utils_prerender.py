@@ -0,0 +1,69 @@
+import pytest
+import pytest_asyncio
+
+from .. import settings, utils
+
+
+@pytest_asyncio.fixture
+async def rendered(monkeypatch):
+    keys: list[str] = []
+    monkeypatch.setattr(
+        utils.prerender, "COUNTS", dict.fromkeys(utils.prerender.COUNTS, 0)
+    )
+    yield keys
+    await utils.prerender.stop()
+
+
+def job(keys: list[str], key: str):
+    async def render():
+        keys.append(key)
+
+    return render
+
+
+def describe_enqueue():
+    @pytest.mark.asyncio
+    async def it_renders_jobs_in_order(expect, rendered):
+        utils.prerender.enqueue("foo", job(rendered, "foo"))
+        utils.prerender.enqueue("bar", job(rendered, "bar"))
+        expect(await utils.prerender.drain()) == 2
+        expect(rendered) == ["foo", "bar"]
+
+    @pytest.mark.asyncio
+    async def it_replaces_pending_jobs_with_the_same_key(expect, rendered):
+        utils.prerender.enqueue("foo", job(rendered, "first"))
+        utils.prerender.enqueue("bar", job(rendered, "bar"))
+        utils.prerender.enqueue("foo", job(rendered, "second"))
+        await utils.prerender.drain()
+        expect(rendered) == ["bar", "second"]
+
+    @pytest.mark.asyncio
+    async def it_drops_the_oldest_jobs_when_full(expect, rendered, monkeypatch):
+        monkeypatch.setattr(settings, "PRERENDER_QUEUE_SIZE", 2)
+        for key in ["foo", "bar", "qux"]:
+            utils.prerender.enqueue(key, job(rendered, key))
+        await utils.prerender.drain()
+        expect(rendered) == ["bar", "qux"]
+        expect(utils.prerender.COUNTS["dropped"]) == 1
+
+
+def describe_drain():
+    @pytest.mark.asyncio
+    async def it_counts_failed_jobs(expect, rendered):
+        async def fail():
+            raise OSError("broken image")
+
+        utils.prerender.enqueue("foo", fail)
+        await utils.prerender.drain()
+        expect(utils.prerender.COUNTS["failed"]) == 1
+
+    @pytest.mark.asyncio
+    async def it_continues_after_unexpected_errors(expect, rendered):
+        async def fail():
+            raise KeyError("style")
+
+        utils.prerender.enqueue("foo", fail)
+        utils.prerender.enqueue("bar", job(rendered, "bar"))
+        expect(await utils.prerender.drain()) == 2
+        expect(rendered) == ["bar"]
+        expect(utils.prerender.COUNTS["failed"]) == 1
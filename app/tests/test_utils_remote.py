@@ -0,0 +1,107 @@
+import pytest
+from anyio import Path as AsyncPath
+
+from .. import settings, utils
+
+
+@pytest.fixture
+def downloads(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DOWNLOADS_DIRECTORY", tmp_path)
+    calls = []
+
+    async def download(url: str, path: AsyncPath, headers=None):
+        calls.append((url, headers))
+        if "missing" in url:
+            return 404, {}
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return 304, {}
+        await path.write_bytes(b"same content")
+        return 200, {"etag": '"v1"', "last_modified": ""}
+
+    monkeypatch.setattr(utils.http, "download", download)
+    return calls
+
+
+def describe_fetch():
+    @pytest.mark.asyncio
+    async def it_reuses_previous_downloads(expect, downloads):
+        path = await utils.remote.fetch("http://example.com/a.png")
+        expect(await utils.remote.fetch("http://example.com/a.png")) == path
+        expect(downloads) == [("http://example.com/a.png", {})]
+
+    @pytest.mark.asyncio
+    async def it_deduplicates_identical_content(expect, downloads):
+        path_a = await utils.remote.fetch("http://example.com/a.png")
+        path_b = await utils.remote.fetch("http://example.com/b.jpg")
+        expect(path_a) == path_b
+        expect(len(list((settings.DOWNLOADS_DIRECTORY / "blobs").glob("*/*")))) == 1
+
+    @pytest.mark.asyncio
+    async def it_redownloads_when_forced(expect, downloads):
+        await utils.remote.fetch("http://example.com/a.png")
+        await utils.remote.fetch("http://example.com/a.png", force=True)
+        expect(len(downloads)) == 2
+        expect(downloads[-1][1]) == {"If-None-Match": '"v1"'}
+
+    @pytest.mark.asyncio
+    async def it_revalidates_expired_downloads(expect, downloads, monkeypatch):
+        monkeypatch.setattr(settings, "REMOTE_IMAGES_TTL", 0)
+        path = await utils.remote.fetch("http://example.com/a.png")
+        expect(await utils.remote.fetch("http://example.com/a.png")) == path
+        expect(downloads[-1]) == ("http://example.com/a.png", {"If-None-Match": '"v1"'})
+
+    @pytest.mark.asyncio
+    async def it_keeps_stale_downloads_when_revalidation_fails(
+        expect, downloads, monkeypatch
+    ):
+        path = await utils.remote.fetch("http://example.com/missing.png")
+        expect(path) == None
+
+        path = await utils.remote.fetch("http://example.com/a.png")
+        record = utils.remote.read("http://example.com/a.png")
+        utils.remote.write("http://example.com/missing.png", record)
+        monkeypatch.setattr(settings, "REMOTE_IMAGES_TTL", 0)
+        expect(await utils.remote.fetch("http://example.com/missing.png")) == path
+
+    @pytest.mark.asyncio
+    async def it_waits_out_the_ttl_after_failed_revalidation(
+        expect, downloads, monkeypatch
+    ):
+        path = await utils.remote.fetch("http://example.com/a.png")
+        record = utils.remote.read("http://example.com/a.png")
+        utils.remote.write("http://example.com/missing.png", record | {"checked": 0})
+        expect(await utils.remote.fetch("http://example.com/missing.png")) == path
+        count = len(downloads)
+
+        expect(await utils.remote.fetch("http://example.com/missing.png")) == path
+        expect(len(downloads)) == count
+
+    @pytest.mark.asyncio
+    async def it_handles_failed_downloads(expect, downloads):
+        expect(await utils.remote.fetch("http://example.com/missing.png")) == None
+
+
+def describe_discard():
+    @pytest.mark.asyncio
+    async def it_removes_the_record_and_blob(expect, downloads, tmp_path):
+        path = await utils.remote.fetch("http://example.com/a.png")
+        assert path
+        linked = tmp_path / "template" / "default.png"
+        utils.remote.link(path, linked)
+
+        utils.remote.discard("http://example.com/a.png")
+        expect(utils.remote.read("http://example.com/a.png")) == {}
+        expect(path.exists()) == False
+        expect(linked.read_bytes()) == b"same content"
+
+
+def describe_link():
+    def it_shares_storage_with_the_source(expect, tmp_path):
+        source = tmp_path / "source"
+        source.write_bytes(b"content")
+        destination = tmp_path / "template" / "default.png"
+
+        utils.remote.link(source, destination)
+
+        expect(destination.read_bytes()) == b"content"
+        expect(source.stat().st_nlink) == 2
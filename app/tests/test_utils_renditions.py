@@ -0,0 +1,86 @@
+import shutil
+
+import pytest
+from PIL import Image
+
+from .. import settings, utils
+
+
+@pytest.fixture
+def directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RENDITIONS_DIRECTORY", tmp_path / "renditions")
+    path = tmp_path / "templates" / "example"
+    path.mkdir(parents=True)
+    Image.new("RGB", (2000, 1500), "red").save(path / "default.jpg")
+    (path / "config.yml").touch()
+    (path / "default.top.jpg").touch()
+    return path
+
+
+def describe_build():
+    def it_writes_renditions_for_each_size(expect, directory):
+        expect(utils.renditions.build(directory)) == 3
+        renditions = utils.renditions.lookup(directory / "default.jpg")
+        expect([size for size, _path in renditions]) == [
+            (400, 300),
+            (800, 600),
+            (1600, 1200),
+        ]
+        expect(Image.open(renditions[0][1]).size) == (400, 300)
+
+    def it_skips_images_smaller_than_the_renditions(expect, directory):
+        Image.new("RGB", (200, 100)).save(directory / "default.jpg")
+        expect(utils.renditions.build(directory)) == 0
+
+    def it_samples_long_animations(expect, directory):
+        frames = [Image.new("RGB", (60, 40), (index, 0, 0)) for index in range(200)]
+        frames[0].save(
+            directory / "default.gif",
+            save_all=True,
+            append_images=frames[1:],
+            duration=20,
+        )
+        utils.renditions.build(directory)
+
+        renditions = utils.renditions.lookup(directory / "default.gif")
+        image = Image.open(renditions[-1][1])
+        expect(image.size) == (60, 40)
+        expect(getattr(image, "n_frames", 1)) == settings.MAXIMUM_FRAMES * 4
+        expect(image.info["duration"]) == 50
+
+
+def describe_lookup():
+    def it_ignores_changed_sources(expect, directory):
+        utils.renditions.build(directory)
+        Image.new("RGB", (2000, 1500), "blue").save(directory / "default.jpg")
+        expect(utils.renditions.lookup(directory / "default.jpg")) == []
+
+
+def describe_select():
+    @pytest.mark.parametrize(
+        ("size", "pad", "expected"),
+        [
+            (settings.PREVIEW_SIZE, False, "default.400x300.jpg"),
+            ((0, 0), False, "default.800x600.jpg"),
+            ((1000, 0), False, "default.1600x1200.jpg"),
+            ((1800, 0), False, "default.jpg"),
+        ],
+    )
+    def it_picks_the_smallest_sufficient_rendition(
+        expect, directory, size, pad, expected
+    ):
+        utils.renditions.build(directory)
+        path = utils.images.select(directory / "default.jpg", size, pad, expand=True)
+        expect(path.name) == expected
+
+    def it_uses_the_source_without_renditions(expect, directory):
+        path = directory / "default.jpg"
+        expect(utils.images.select(path, (0, 0), False, expand=True)) == path
+
+    def it_prefers_preloaded_sources(expect, directory, monkeypatch):
+        monkeypatch.setattr(utils.images, "_preloaded", {})
+        utils.renditions.build(directory)
+        path = directory / "default.jpg"
+        utils.images.preload(path)
+        selected = utils.images.select(path, settings.PREVIEW_SIZE, False, expand=True)
+        expect(selected) == path
@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+from .. import settings, utils
+
+
+@pytest.fixture(autouse=True)
+def keys(monkeypatch):
+    monkeypatch.setattr(settings, "SIGNING_KEYS", {"new": "secret", "old": "prior"})
+
+
+def describe_sign():
+    def it_adds_expiry_key_and_signature(expect):
+        url = utils.signing.sign("http://localhost/images/fry/test.png?width=300")
+        expect(url).contains("width=300&expires=")
+        expect(url).contains("&key_id=new&signature=")
+
+    def it_replaces_an_existing_signature(expect):
+        url = utils.signing.sign("/images/fry/test.png")
+        url = utils.signing.sign(url, key_id="old")
+        expect(url.count("signature=")) == 1
+        expect(utils.signing.verify(url)) == True
+
+
+def describe_verify():
+    def it_ignores_unsigned_urls(expect):
+        expect(utils.signing.verify("/images/fry/test.png")) == None
+
+    def it_accepts_signed_urls(expect):
+        url = utils.signing.sign("/images/fry/test.png?watermark=example.com")
+        expect(utils.signing.verify(url)) == True
+
+    def it_accepts_urls_on_other_hosts(expect):
+        url = utils.signing.sign("http://localhost/images/fry/test.png")
+        url = url.replace("http://localhost", "https://api.memegen.link")
+        expect(utils.signing.verify(url)) == True
+
+    def it_accepts_retired_keys(expect):
+        url = utils.signing.sign("/images/fry/test.png", key_id="old")
+        expect(utils.signing.verify(url)) == True
+
+    def it_rejects_modified_urls(expect):
+        url = utils.signing.sign("/images/fry/test.png?watermark=example.com")
+        url = url.replace("example.com", "example.org")
+        expect(utils.signing.verify(url)) == False
+
+    def it_rejects_unknown_keys(expect, monkeypatch):
+        url = utils.signing.sign("/images/fry/test.png", key_id="old")
+        monkeypatch.setattr(settings, "SIGNING_KEYS", {"new": "secret"})
+        expect(utils.signing.verify(url)) == False
+
+    def it_rejects_expired_urls(expect, monkeypatch):
+        url = utils.signing.sign("/images/fry/test.png")
+        later = time.time() + settings.SIGNING_TTL + 1
+        monkeypatch.setattr(time, "time", lambda: later)
+        expect(utils.signing.verify(url)) == False
@@ -0,0 +1,102 @@
+import os
+import time
+
+import pytest
+
+from .. import settings, utils
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "IMAGES_DIRECTORY", tmp_path / "images")
+    monkeypatch.setattr(settings, "DOWNLOADS_DIRECTORY", tmp_path / "downloads")
+    path = tmp_path / "templates"
+    for index, age in enumerate([300, 200, 100]):
+        directory = path / f"_custom-{index}"
+        directory.mkdir(parents=True)
+        (directory / "default.jpg").write_bytes(b"x" * 100)
+        utils.storage.touch(directory)
+        accessed = time.time() - age
+        os.utime(directory / utils.storage.ACCESS_MARKER, (accessed, accessed))
+    (path / "fry").mkdir()
+    return path
+
+
+def describe_listing():
+    def it_groups_files_by_stem(expect, tmp_path):
+        (tmp_path / "default.jpg").touch()
+        (tmp_path / "default.gif").touch()
+        (tmp_path / "config.yml").touch()
+        listing = utils.storage.listing(tmp_path)
+        expect(sorted(listing)) == ["config", "default"]
+        expect(len(listing["default"])) == 2
+
+    def it_reuses_listings_until_the_directory_changes(expect, tmp_path):
+        (tmp_path / "default.jpg").touch()
+        listing = utils.storage.listing(tmp_path)
+        expect(utils.storage.listing(tmp_path)).is_(listing)
+
+        (tmp_path / "alt.jpg").touch()
+        os.utime(tmp_path, ns=(0, tmp_path.stat().st_mtime_ns + 1))
+        expect(sorted(utils.storage.listing(tmp_path))) == ["alt", "default"]
+
+    def it_refreshes_forgotten_directories(expect, tmp_path):
+        utils.storage.listing(tmp_path)
+        (tmp_path / "alt.jpg").touch()
+        utils.storage.forget(tmp_path)
+        expect(sorted(utils.storage.listing(tmp_path))) == ["alt"]
+
+    def it_handles_missing_directories(expect, tmp_path):
+        expect(utils.storage.listing(tmp_path / "unknown")) == {}
+
+
+def describe_scan():
+    def it_orders_custom_templates_by_last_access(expect, root):
+        entries = utils.storage.scan(root)
+        expect([entry[2].name for entry in entries]) == [
+            "_custom-0",
+            "_custom-1",
+            "_custom-2",
+        ]
+        expect([entry[1] for entry in entries]) == [100, 100, 100]
+
+
+def describe_evict():
+    def it_removes_least_recently_used_templates(expect, root):
+        evicted = utils.storage.evict(root, quota=150, grace=0)
+        expect([path.name for path in evicted]) == ["_custom-0", "_custom-1"]
+        expect(sorted(path.name for path in root.iterdir())) == ["_custom-2", "fry"]
+
+    def it_includes_rendered_images(expect, root):
+        images = settings.IMAGES_DIRECTORY / "_custom-0"
+        images.mkdir(parents=True)
+        (images / "test.png").write_bytes(b"x" * 100)
+
+        evicted = utils.storage.evict(root, quota=250, grace=0)
+        expect([path.name for path in evicted]) == ["_custom-0"]
+        expect(images.exists()) == False
+
+    def it_skips_templates_in_use(expect, root):
+        with utils.storage.using(root / "_custom-0"):
+            evicted = utils.storage.evict(root, quota=250, grace=0)
+        expect([path.name for path in evicted]) == ["_custom-1"]
+
+    def it_skips_recently_accessed_templates(expect, root):
+        evicted = utils.storage.evict(root, quota=0, grace=150)
+        expect([path.name for path in evicted]) == ["_custom-0", "_custom-1"]
+
+    def it_keeps_templates_within_quota(expect, root):
+        expect(utils.storage.evict(root, quota=1000, grace=0)) == []
+
+    def it_removes_unlinked_downloads(expect, root):
+        blob = settings.DOWNLOADS_DIRECTORY / "blobs" / "ab" / "abc123"
+        blob.parent.mkdir(parents=True)
+        blob.write_bytes(b"x" * 100)
+        os.utime(blob, (0, 0))
+        linked = root / "_custom-2" / "default.jpg"
+        linked.unlink()
+        os.link(blob, linked)
+
+        evicted = utils.storage.evict(root, quota=250, grace=0)
+        expect([path.name for path in evicted]) == ["_custom-0"]
+        expect(blob.exists()) == True
@@ -0,0 +1,54 @@
+import pytest
+
+from .. import settings, utils
+from ..models import REGISTRY, Template
+
+
+@pytest.fixture(scope="module")
+def directory(tmp_path_factory):
+    path = tmp_path_factory.mktemp("examples")
+    templates = [Template.objects.get("fry"), Template.objects.get("iw")]
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(REGISTRY, "all", lambda: templates)
+        utils.thumbnails.build(path, sprite=True)
+    return path
+
+
+@pytest.fixture
+def examples(directory, monkeypatch):
+    monkeypatch.setattr(settings, "EXAMPLES_DIRECTORY", directory)
+    return directory
+
+
+def describe_build():
+    def it_renders_static_and_animated_thumbnails(expect, directory):
+        index = utils.thumbnails.read(directory)
+        expect(index["thumbnails"]["fry"]) == {"png": "fry.png", "gif": "fry.gif"}
+        expect((directory / "iw.gif").exists()) == True
+
+    def it_packs_static_thumbnails_into_a_sprite(expect, directory):
+        sprite = utils.thumbnails.read(directory)["sprite"]
+        expect((directory / sprite["file"]).exists()) == True
+        expect(sprite["positions"]["fry"][:2]) == [0, 0]
+        expect(sprite["positions"]["iw"][:2]) == [settings.PREVIEW_SIZE[0], 0]
+
+
+def describe_lookup():
+    def it_uses_sprite_tiles_for_static_images(expect, examples):
+        items = [("http://localhost/images/fry.png", "http://localhost/templates/fry")]
+        sources, sprite = utils.thumbnails.lookup(items)
+        expect(sources) == {}
+        expect(sprite["url"]) == "/examples/thumbnails/sprite.jpg"
+        expect(list(sprite["positions"])) == ["http://localhost/images/fry.png"]
+
+    def it_uses_thumbnails_for_animated_images(expect, examples):
+        items = [("http://localhost/images/iw.gif", "http://localhost/templates/iw")]
+        sources, sprite = utils.thumbnails.lookup(items)
+        expect(sources) == {
+            "http://localhost/images/iw.gif": "/examples/thumbnails/iw.gif"
+        }
+        expect(sprite) == {}
+
+    def it_skips_unknown_templates(expect, examples):
+        items = [("http://localhost/images/xyz.png", "http://localhost/templates/xyz")]
+        expect(utils.thumbnails.lookup(items)) == ({}, {})
@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from .. import settings, utils
+
+
+@pytest_asyncio.fixture
+async def tracker(monkeypatch):
+    events: list[dict] = []
+
+    async def handle(request):
+        events.append(dict(request.query))
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_get("/", handle)
+    async with TestServer(app) as server:
+        monkeypatch.setattr(settings, "TRACK_REQUESTS", True)
+        monkeypatch.setattr(settings, "REMOTE_TRACKING_URL", str(server.make_url("/")))
+        monkeypatch.setattr(utils.breakers, "BREAKERS", {})
+        monkeypatch.setattr(
+            utils.tracking, "COUNTS", dict.fromkeys(utils.tracking.COUNTS, 0)
+        )
+        yield events
+        await utils.tracking.stop()
+        utils.tracking._queue.clear()
+
+
+def event(text: str) -> utils.tracking.Event:
+    return utils.tracking.Event({"text": text})
+
+
+def describe_enqueue():
+    @pytest.mark.asyncio
+    async def it_flushes_when_a_batch_is_full(expect, tracker, monkeypatch):
+        monkeypatch.setattr(settings, "REMOTE_TRACKING_BATCH_SIZE", 2)
+        utils.tracking.enqueue(event("foo"))
+        await asyncio.sleep(0.1)
+        expect(tracker) == []
+
+        utils.tracking.enqueue(event("bar"))
+        await asyncio.sleep(0.1)
+        expect(tracker) == [{"text": "foo"}, {"text": "bar"}]
+        expect(utils.tracking.COUNTS["sent"]) == 2
+
+    @pytest.mark.asyncio
+    async def it_flushes_after_an_interval(expect, tracker, monkeypatch):
+        monkeypatch.setattr(settings, "REMOTE_TRACKING_FLUSH_INTERVAL", 0.1)
+        utils.tracking.enqueue(event("foo"))
+        await asyncio.sleep(0.3)
+        expect(tracker) == [{"text": "foo"}]
+
+    @pytest.mark.asyncio
+    async def it_drops_the_oldest_events_when_full(expect, tracker, monkeypatch):
+        monkeypatch.setattr(settings, "REMOTE_TRACKING_QUEUE_SIZE", 2)
+        for text in ["foo", "bar", "qux"]:
+            utils.tracking.enqueue(event(text))
+        await utils.tracking.flush()
+        expect(tracker) == [{"text": "bar"}, {"text": "qux"}]
+        expect(utils.tracking.COUNTS["dropped"]) == 1
+
+
+def describe_flush():
+    @pytest.mark.asyncio
+    async def it_skips_the_session_when_idle(expect, tracker, monkeypatch):
+        monkeypatch.setattr(utils.tracking.aiohttp, "ClientSession", None)
+        expect(await utils.tracking.flush()) == 0
+
+
+def describe_stop():
+    @pytest.mark.asyncio
+    async def it_flushes_pending_events(expect, tracker):
+        utils.tracking.enqueue(event("foo"))
+        await utils.tracking.stop()
+        expect(tracker) == [{"text": "foo"}]
+
+    @pytest.mark.asyncio
+    async def it_sends_batches_interrupted_by_shutdown(expect, tracker, monkeypatch):
+        send = utils.tracking._send
+        started = asyncio.Event()
+
+        async def slow(session, event):
+            started.set()
+            await asyncio.sleep(0 if utils.tracking._worker is None else 10)
+            return await send(session, event)
+
+        monkeypatch.setattr(utils.tracking, "_send", slow)
+        monkeypatch.setattr(settings, "REMOTE_TRACKING_BATCH_SIZE", 1)
+        utils.tracking.enqueue(event("foo"))
+        await started.wait()
+        await utils.tracking.stop()
+        expect(tracker) == [{"text": "foo"}]
+
+    @pytest.mark.asyncio
+    async def it_keeps_events_while_the_circuit_is_open(expect, tracker):
+        utils.breakers.get("track")._open(time.monotonic())
+        utils.tracking.enqueue(event("foo"))
+        await utils.tracking.flush()
+        expect(tracker) == []
+        expect(len(utils.tracking._queue)) == 1
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from .. import settings, utils
+
+
+@pytest.fixture
+def status(monkeypatch):
+    monkeypatch.setattr(utils.warmup, "STATUS", {"ready": False})
+    monkeypatch.setattr(utils.images, "_preloaded", {})
+    return utils.warmup.STATUS
+
+
+def describe_popular():
+    def it_ranks_templates_by_rendered_images(expect, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "IMAGES_DIRECTORY", tmp_path)
+        for id, count in [("iw", 1), ("fry", 3)]:
+            (tmp_path / id).mkdir()
+            for index in range(count):
+                (tmp_path / id / f"{index}.png").touch()
+        expect(utils.warmup.popular(2)) == ["fry", "iw"]
+
+
+def describe_run():
+    def it_preloads_popular_backgrounds(expect, status):
+        utils.warmup.run(limit=2)
+        expect(status["ready"]) == True
+        expect(status["backgrounds"]) == 2
+        expect(len(utils.images._preloaded)) == 2
+
+    def it_only_runs_once(expect, status):
+        utils.warmup.run(limit=1)
+        duration = status["duration"]
+        utils.warmup.run(limit=1)
+        expect(status["duration"]) == duration
+
+    def it_only_runs_once_concurrently(expect, status, monkeypatch):
+        calls = []
+        fonts = utils.warmup.fonts
+
+        def counted():
+            calls.append(1)
+            return fonts()
+
+        monkeypatch.setattr(utils.warmup, "fonts", counted)
+        with ThreadPoolExecutor() as executor:
+            list(executor.map(lambda _: utils.warmup.run(limit=1), range(3)))
+        expect(len(calls)) == 1
+
+
+def describe_load():
+    def it_copies_preloaded_backgrounds(expect, status):
+        path = settings.TEMPLATES_DIRECTORY / "iw" / "default.png"
+        utils.images.preload(path)
+        image = utils.images.load(path)
+        expect(image) == utils.images._preloaded[path][1]
+        expect(image).is_not(utils.images._preloaded[path][1])
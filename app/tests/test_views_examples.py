@@ -34,3 +34,17 @@ def describe_examples():
             expect(response.status) == 200
             expect(response.text.count("png")) > 100
             expect(response.text).excludes("setInterval")
+
+
+def describe_thumbnails():
+    def it_returns_404_for_missing_files(expect, client, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "EXAMPLES_DIRECTORY", tmp_path)
+        request, response = client.get("/examples/thumbnails/unknown.png")
+        expect(response.status) == 404
+
+    def it_serves_built_files(expect, client, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "EXAMPLES_DIRECTORY", tmp_path)
+        (tmp_path / "fry.png").write_bytes(b"data")
+        request, response = client.get("/examples/thumbnails/fry.png")
+        expect(response.status) == 200
+        expect(response.headers["Cache-Control"]).contains("max-age")
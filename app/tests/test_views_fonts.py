@@ -4,6 +4,20 @@ def describe_list():
             request, response = client.get("/fonts")
             expect(len(response.json)) == 7
 
+        def it_includes_an_etag(expect, client):
+            request, response = client.get("/fonts")
+            etag = response.headers["ETag"]
+            request, response = client.get("/fonts", headers={"If-None-Match": etag})
+            expect(response.status) == 304
+            expect(response.headers["ETag"]) == etag
+
+        def it_supports_compression(expect, client):
+            request, response = client.get(
+                "/fonts", headers={"Accept-Encoding": "gzip"}
+            )
+            expect(response.headers["Content-Encoding"]) == "gzip"
+            expect(len(response.json)) == 7
+
 
 def describe_detail():
     def describe_GET():
@@ -3,8 +3,10 @@ from unittest.mock import Mock
 
 import pytest
 
+from .. import settings, utils
 from ..models import Template
-from ..views.helpers import preview_image
+from ..views import helpers
+from ..views.helpers import prerender, preview_image
 
 
 @pytest.mark.asyncio
@@ -32,3 +34,37 @@ async def test_preview_images_animated(images: Path, template: Template):
     path = images / "preview-animated.jpg"
     response = await preview_image(request, template.id, "animated", lines)
     path.write_bytes(response.body)
+
+
+@pytest.mark.asyncio
+async def test_prerender_images(expect, monkeypatch):
+    monkeypatch.setattr(settings, "PRERENDER", True)
+    monkeypatch.setattr(
+        utils.prerender, "COUNTS", dict.fromkeys(utils.prerender.COUNTS, 0)
+    )
+    url = "http://localhost:5000/images/fry/pre/rendered.png?width=300"
+    prerender(url, url, "")
+    expect(await utils.prerender.drain()) == 1
+    expect(utils.prerender.COUNTS["rendered"]) == 1
+    await utils.prerender.stop()
+
+
+@pytest.mark.asyncio
+async def test_prerender_images_with_the_resolved_watermark(expect, monkeypatch):
+    monkeypatch.setattr(settings, "PRERENDER", True)
+    watermarks = []
+
+    async def save(args, id, slug, watermark, extension):
+        watermarks.append(watermark)
+
+    monkeypatch.setattr(helpers, "save_image", save)
+    url = "http://localhost:5000/images/fry/pre/rendered.png?watermark=none"
+    prerender(url, url, "example.com")
+    await utils.prerender.drain()
+    expect(watermarks) == ["example.com"]
+    await utils.prerender.stop()
+
+
+def test_prerender_is_disabled_by_default(expect):
+    prerender("foo", "http://localhost:5000/images/fry/pre/rendered.png", "")
+    expect(utils.prerender._queue) == {}
@@ -3,7 +3,7 @@ from unittest.mock import AsyncMock, patch
 
 import pytest
 
-from .. import settings
+from .. import settings, utils
 
 
 def describe_list():
@@ -153,6 +153,31 @@ def describe_list():
             expect(response.json) == {"error": '"template_id" is required'}
 
 
+def describe_srcset():
+    def it_returns_a_url_for_each_size(expect, client, monkeypatch):
+        monkeypatch.setattr(settings, "SIZE_BUCKETS", [300, 600])
+        url = "http://localhost:5000/images/fry/a/b.png?width=250&height=100"
+        request, response = client.get("/images/srcset", params={"url": url})
+        expect(response.status) == 200
+        expect(response.json["images"]) == [
+            {"url": "http://localhost:5000/images/fry/a/b.png?width=300", "width": 300},
+            {"url": "http://localhost:5000/images/fry/a/b.png?width=600", "width": 600},
+        ]
+        expect(response.json["srcset"]) == (
+            "http://localhost:5000/images/fry/a/b.png?width=300 300w, "
+            "http://localhost:5000/images/fry/a/b.png?width=600 600w"
+        )
+
+    def it_requires_a_url(expect, client, monkeypatch):
+        monkeypatch.setattr(settings, "SIZE_BUCKETS", [300, 600])
+        request, response = client.get("/images/srcset")
+        expect(response.status) == 400
+
+    def it_is_disabled_by_default(expect, client):
+        request, response = client.get("/images/srcset?url=foobar")
+        expect(response.status) == 404
+
+
 def describe_detail():
     @pytest.mark.slow
     @pytest.mark.parametrize(
@@ -173,6 +198,17 @@ def describe_detail():
         expect(response.status) == 200
         expect(response.headers["content-type"]) == content_type
 
+    @pytest.mark.parametrize("path", ["/images/fry.png", "/images/ds.jpg?width=300"])
+    def it_serves_blank_images_without_text(expect, client, monkeypatch, path):
+        monkeypatch.delattr(utils.images, "get_image_elements")
+        request, response = client.get(path)
+        expect(response.status) == 200
+
+    def it_renders_blank_images_with_options(expect, client, monkeypatch):
+        monkeypatch.setattr(utils.images, "blank", None)
+        request, response = client.get("/images/fry.png?layout=top")
+        expect(response.status) == 200
+
     def it_handles_placeholder_templates(expect, client):
         request, response = client.get("/images/string/test.png")
         expect(response.status) == 200
@@ -262,6 +298,12 @@ def describe_detail():
             )
             expect(response.status) == 200
 
+        def it_accepts_custom_values_when_signed(expect, client, monkeypatch):
+            monkeypatch.setattr(settings, "SIGNING_KEYS", {"test": "secret"})
+            url = utils.signing.sign("/images/fry/test.png?watermark=mydomain.com")
+            request, response = client.get(url, allow_redirects=False)
+            expect(response.status) == 200
+
         def it_rejects_invalid_authentication(expect, client):
             request, response = client.get(
                 "/images/fry/test.png?watermark=blank",
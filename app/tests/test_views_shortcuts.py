@@ -27,7 +27,7 @@ def describe_image_redirects():
             "/images/fry/test&width=99&height=99", allow_redirects=False
         )
         redirect = "/images/fry/test.png?width=99&height=99"
-        expect(response.status) == 302
+        expect(response.status) == 301
         expect(response.headers["Location"]) == redirect
 
     def it_fixes_misplaced_file_extension(expect, client):
@@ -42,7 +42,7 @@ def describe_image_redirects():
             "/images/fry/test.jpg" + extra, allow_redirects=False
         )
         redirect = "/images/fry/test.jpg"
-        expect(response.status) == 302
+        expect(response.status) == 301
         expect(response.headers["Location"]) == redirect
 
     def it_fixes_misplaced_query_params_on_image(expect, client):
@@ -50,7 +50,7 @@ def describe_image_redirects():
             "/images/fry/test.jpg&width=99&height=99", allow_redirects=False
         )
         redirect = "/images/fry/test.jpg?width=99&height=99"
-        expect(response.status) == 302
+        expect(response.status) == 301
         expect(response.headers["Location"]) == redirect
 
     def it_truncates_invalid_path_values(expect, client):
@@ -58,7 +58,7 @@ def describe_image_redirects():
             "/images/fry/test//style=foobar", allow_redirects=False
         )
         redirect = "/images/fry/test.png"
-        expect(response.status) == 302
+        expect(response.status) == 301
         expect(response.headers["Location"]) == redirect
 
     def it_handles_encoded_newlines(expect, client):
@@ -67,6 +67,35 @@ def describe_image_redirects():
         expect(response.status) == 301
         expect(response.headers["Location"]) == redirect
 
+    def it_combines_redirects_into_a_single_hop(expect, client):
+        request, response = client.get(
+            "/images/fry/One Two.png?style=animated&watermark=foobar",
+            allow_redirects=False,
+        )
+        expect(response.status) == 302
+        expect(response.headers["Location"]) == "/images/fry/One_Two.gif"
+
+    def it_can_serve_canonical_content_directly(expect, client, monkeypatch):
+        monkeypatch.setattr(settings, "CANONICAL_REDIRECTS", False)
+        request, response = client.get(
+            "/images/fry/One Two.png?style=animated", allow_redirects=False
+        )
+        expect(response.status) == 200
+        expect(response.headers["Content-Type"]) == "image/gif"
+        expect(response.headers["Content-Location"]) == "/images/fry/One_Two.gif"
+
+    def it_serves_parameters_fixed_from_the_path(expect, client, monkeypatch):
+        monkeypatch.setattr(settings, "CANONICAL_REDIRECTS", False)
+        request, response = client.get(
+            "/images/fry/test.png&width=300&name=test.png", allow_redirects=False
+        )
+        expect(response.status) == 200
+        expect(response.headers["Content-Location"]) == (
+            "/images/fry/test.png?width=300&name=test.png"
+        )
+        request, canonical = client.get(response.headers["Content-Location"])
+        expect(response.content) == canonical.content
+
 
 def describe_path_redirects():
     def it_redirects_to_example_image_when_no_extension(expect, client):
@@ -79,7 +108,7 @@ def describe_path_redirects():
         request, response = client.get(
             "/images/fry/foo bar/._XD\\XD", allow_redirects=False
         )
-        expect(response.status) == 302
+        expect(response.status) == 301
         expect(response.headers["Location"]) == "/images/fry/foo_bar/._XD~bXD.png"
 
     def it_returns_gallery_view_when_debug(expect, client, monkeypatch):
@@ -127,9 +156,16 @@ def describe_legacy_images():
     @pytest.mark.parametrize("extension", ["png", "jpg"])
     def it_redirects_to_custom_image(expect, client, extension):
         request, response = client.get(f"/fry/test.{extension}", allow_redirects=False)
-        expect(response.status) == 302
+        expect(response.status) == 301
         expect(response.headers["Location"]) == f"/images/fry/test.{extension}"
 
+    def it_redirects_to_canonical_image(expect, client):
+        request, response = client.get(
+            "/fry/not sure.jpg?style=animated", allow_redirects=False
+        )
+        expect(response.status) == 301
+        expect(response.headers["Location"]) == "/images/fry/not_sure.gif"
+
 
 def describe_legacy_paths():
     @pytest.mark.parametrize("suffix", ["", ".png", ".jpg"])
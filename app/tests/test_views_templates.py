@@ -2,6 +2,9 @@ import json
 
 import pytest
 
+from .. import utils
+from ..models import REGISTRY
+
 
 def describe_list():
     def describe_GET():
@@ -18,6 +21,44 @@ def describe_list():
             expect(response.status) == 200
             expect(len(response.json)) == 3
 
+        def it_can_limit_fields(expect, client):
+            request, response = client.get("/templates?fields=id,lines&limit=1")
+            expect(response.status) == 200
+            expect(response.json) == [{"id": "aag", "lines": 2}]
+
+        def it_supports_compact_mode(expect, client):
+            request, response = client.get("/templates?compact=true&limit=1")
+            expect(list(response.json[0])) == ["id", "name", "lines", "styles"]
+
+        def it_paginates_with_offsets(expect, client):
+            request, response = client.get("/templates?fields=id&limit=2&offset=1")
+            expect([item["id"] for item in response.json]) == ["ackbar", "afraid"]
+            expect(int(response.headers["X-Total-Count"])) >= 140
+
+        def it_paginates_with_cursors(expect, client):
+            request, response = client.get("/templates?fields=id&limit=2")
+            expect([item["id"] for item in response.json]) == ["aag", "ackbar"]
+            expect(response.headers["Link"]).contains("cursor=ackbar")
+
+            request, response = client.get("/templates?fields=id&limit=2&cursor=ackbar")
+            expect([item["id"] for item in response.json]) == ["afraid", "agnes"]
+
+        def it_caches_page_headers(expect, client, monkeypatch):
+            utils.responses.clear()
+            calls = []
+            filter = REGISTRY.filter
+
+            def counted(*args, **kwargs):
+                calls.append(args)
+                return filter(*args, **kwargs)
+
+            monkeypatch.setattr(REGISTRY, "filter", counted)
+            for _attempt in range(2):
+                request, response = client.get("/templates?fields=id&limit=2")
+                expect(int(response.headers["X-Total-Count"])) >= 140
+                expect(response.headers["Link"]).contains("cursor=ackbar")
+            expect(len(calls)) == 1
+
 
 def describe_detail():
     def describe_GET():
@@ -1 +1,20 @@
-from . import html, http, images, meta, text, urls
+from . import (
+    breakers,
+    cache,
+    html,
+    http,
+    images,
+    meta,
+    pack,
+    prerender,
+    remote,
+    renditions,
+    responses,
+    signing,
+    storage,
+    text,
+    thumbnails,
+    tracking,
+    urls,
+    warmup,
+)
@@ -0,0 +1,93 @@
+import time
+from collections import deque
+
+from sanic.log import logger
+
+from .. import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class Breaker:
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.counts = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+        self._results: deque[tuple[float, bool]] = deque()
+        self._opened = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            elapsed = time.monotonic() - self._opened
+            if elapsed < settings.REMOTE_TRACKING_COOLDOWN:
+                self.counts["rejected"] += 1
+                return False
+            logger.info(f"Probing remote {self.name} endpoint")
+            self.state = HALF_OPEN
+
+        if self.state == HALF_OPEN:
+            # Only one request at a time checks if the endpoint has recovered
+            if self._probing:
+                self.counts["rejected"] += 1
+                return False
+            self._probing = True
+
+        return True
+
+    def record(self, success: bool):
+        now = time.monotonic()
+        self.counts["successes" if success else "failures"] += 1
+
+        if self.state == OPEN:
+            return
+
+        if self.state == HALF_OPEN:
+            self._probing = False
+            if success:
+                logger.info(f"Closed circuit for remote {self.name} endpoint")
+                self.state = CLOSED
+                self._results.clear()
+            else:
+                self._open(now)
+            return
+
+        self._results.append((now, success))
+        while now - self._results[0][0] > settings.REMOTE_TRACKING_WINDOW:
+            self._results.popleft()
+
+        failures = sum(1 for _time, ok in self._results if not ok)
+        if (
+            failures >= settings.REMOTE_TRACKING_ERRORS_LIMIT
+            and failures / len(self._results) >= settings.REMOTE_TRACKING_ERRORS_RATE
+        ):
+            self._open(now)
+
+    def release(self):
+        # A cancelled probe says nothing about the endpoint, so let another try
+        self._probing = False
+
+    def _open(self, now: float):
+        logger.warning(f"Opened circuit for remote {self.name} endpoint")
+        self.state = OPEN
+        self.counts["opened"] += 1
+        self._opened = now
+        self._results.clear()
+
+    def jsonify(self) -> dict:
+        return {"state": self.state, **self.counts}
+
+
+BREAKERS: dict[str, Breaker] = {}
+
+
+def get(name: str) -> Breaker:
+    if name not in BREAKERS:
+        BREAKERS[name] = Breaker(name)
+    return BREAKERS[name]
+
+
+def metrics() -> dict[str, dict]:
+    return {name: breaker.jsonify() for name, breaker in sorted(BREAKERS.items())}
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from sanic.log import logger
+
+MAXIMUM_SIZE = 10_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    expires REAL NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (name, key)
+)
+"""
+
+
+class Cache:
+    def __init__(self, name: str, path: Path | str | None = None):
+        self.name = name
+        self.path = Path(path) if path else None
+        self._memory: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._connection: tuple[int, sqlite3.Connection] | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._memory)
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        hit, value = self._recall(key)
+        if hit or not self.path:
+            return hit, value
+        return self._restore(key, self._read(key))
+
+    async def fetch(self, key: str) -> tuple[bool, Any]:
+        # SQLite calls block, so only the in-memory lookup runs on the event loop
+        hit, value = self._recall(key)
+        if hit or not self.path:
+            return hit, value
+        return self._restore(key, await asyncio.to_thread(self._read, key))
+
+    def set(self, key: str, value: Any, ttl: float):
+        expires = time.time() + ttl
+        self._remember(key, expires, value)
+        if self.path:
+            self._write(key, expires, value)
+
+    async def store(self, key: str, value: Any, ttl: float):
+        expires = time.time() + ttl
+        self._remember(key, expires, value)
+        if self.path:
+            await asyncio.to_thread(self._write, key, expires, value)
+
+    def clear(self):
+        self._memory.clear()
+        with self._lock:
+            if connection := self._connect():
+                with connection:
+                    connection.execute("DELETE FROM cache WHERE name = ?", (self.name,))
+
+    def _recall(self, key: str) -> tuple[bool, Any]:
+        if key in self._memory:
+            expires, value = self._memory[key]
+            if expires > time.time():
+                self._memory.move_to_end(key)
+                return True, value
+            del self._memory[key]
+        return False, None
+
+    def _restore(self, key: str, row: tuple[float, str] | None) -> tuple[bool, Any]:
+        if row and row[0] > time.time():
+            value = json.loads(row[1])
+            self._remember(key, row[0], value)
+            return True, value
+        return False, None
+
+    def _read(self, key: str) -> tuple[float, str] | None:
+        with self._lock:
+            if connection := self._connect():
+                try:
+                    return connection.execute(
+                        "SELECT expires, value FROM cache WHERE name = ? AND key = ?",
+                        (self.name, key),
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.error(f"Unable to read {self.name} cache: {e}")
+        return None
+
+    def _write(self, key: str, expires: float, value: Any):
+        with self._lock:
+            if connection := self._connect():
+                try:
+                    with connection:
+                        connection.execute(
+                            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                            (self.name, key, expires, json.dumps(value)),
+                        )
+                        connection.execute(
+                            "DELETE FROM cache WHERE name = ? AND expires < ?",
+                            (self.name, time.time()),
+                        )
+                except sqlite3.Error as e:
+                    logger.error(f"Unable to write {self.name} cache: {e}")
+
+    def _remember(self, key: str, expires: float, value: Any):
+        self._memory[key] = expires, value
+        self._memory.move_to_end(key)
+        while len(self._memory) > MAXIMUM_SIZE:
+            self._memory.popitem(last=False)
+
+    def _connect(self) -> sqlite3.Connection | None:
+        if not self.path:
+            return None
+        # Connections can't be shared with forked workers
+        if self._connection and self._connection[0] == os.getpid():
+            return self._connection[1]
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Reads and writes run in worker threads, serialized by the lock
+            connection = sqlite3.connect(self.path, timeout=1, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(SCHEMA)
+        except sqlite3.Error as e:
+            logger.error(f"Unable to open {self.name} cache at {self.path}: {e}")
+            self.path = None
+            return None
+        self._connection = os.getpid(), connection
+        return connection
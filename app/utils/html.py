@@ -49,6 +49,12 @@ COLUMNS_STYLE = """
   }
 }
 
+#images .sprite {
+  display: block;
+  width: 100%;
+  background-repeat: no-repeat;
+}
+
 body {
   margin: 0;
   padding: 0;
@@ -97,24 +103,33 @@ def gallery(
     columns: bool,
     refresh: int,
     query_string: str = "",
+    thumbnails: dict[str, str] | None = None,
+    sprite: dict | None = None,
 ) -> str:
     extra = "&" + query_string if query_string else ""
     if columns:
         if refresh:
             return _columns_debug(urls, refresh, extra)
-        return _columns(urls)
+        return _columns(urls, thumbnails or {}, sprite or {})
     assert refresh
     return _grid_debug(urls, refresh, extra)
 
 
-def _columns(urls: list[str]) -> str:
+def _columns(urls: list[str], thumbnails: dict[str, str], sprite: dict) -> str:
     elements = []
 
     for url in urls:
+        if url in sprite.get("positions", {}):
+            element = _sprite(sprite, url)
+        else:
+            src = thumbnails.get(
+                url, f"{url}?width={settings.PREVIEW_SIZE[0]}&frames=10"
+            )
+            element = f'<img src="{src}">'
         elements.append(
             f"""
             <a href="https://memecomplete.com/edit/{url}" target="_parent">
-                <img src="{url}?width={settings.PREVIEW_SIZE[0]}&frames=10">
+                {element}
             </a>
             """
         )
@@ -129,6 +144,22 @@ def _columns(urls: list[str]) -> str:
     return HTML.format(head=head, body=body)
 
 
+def _sprite(sprite: dict, url: str) -> str:
+    sheet_width, sheet_height = sprite["size"]
+    x, y, width, height = sprite["positions"][url]
+    left = x / (sheet_width - width) * 100 if sheet_width > width else 0
+    top = y / (sheet_height - height) * 100 if sheet_height > height else 0
+    style = ";".join(
+        [
+            f"aspect-ratio:{width}/{height}",
+            f"background-image:url({sprite['url']})",
+            f"background-size:{sheet_width / width * 100:.4f}% auto",
+            f"background-position:{left:.4f}% {top:.4f}%",
+        ]
+    )
+    return f'<span class="sprite" style="{style}"></span>'
+
+
 def _columns_debug(urls: list[str], refresh: int, extra: str) -> str:
     elements = []
 
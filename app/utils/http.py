@@ -34,17 +34,19 @@ async def fetch(url: str, **kwargs) -> tuple[int, dict | str]:
             return 500, message
 
 
-async def download(url: str, path: AsyncPath) -> bool:
+async def download(
+    url: str, path: AsyncPath, *, headers: dict[str, str] | None = None
+) -> tuple[int, dict[str, str]]:
     async with aiohttp.ClientSession(
         skip_auto_headers=["User-Agent"], timeout=aiohttp.ClientTimeout(10)
     ) as session:
         try:
-            async with session.get(url) as response:
+            async with session.get(url, headers=headers) as response:
                 if response.history:
                     # TODO: Figure out which sites use 3xx as errors
                     if "imgur" in url:
                         logger.error(f"3xx response from {url}")
-                        return False
+                        return response.history[0].status, {}
                     logger.warning(f"3xx redirect from {url}")
                     url = str(response.url)
 
@@ -53,12 +55,21 @@ async def download(url: str, path: AsyncPath) -> bool:
                     f = await aiofiles.open(path, mode="wb")  # type: ignore
                     await f.write(await response.read())
                     await f.close()
-                    return True
+                    validators = {
+                        "etag": response.headers.get("ETag", ""),
+                        "last_modified": response.headers.get("Last-Modified", ""),
+                    }
+                    return response.status, validators
+
+                if response.status == 304:
+                    logger.info(f"304 response from {url}")
+                    return response.status, {}
 
                 logger.error(f"{response.status} response from {url}")
+                return response.status, {}
 
         except EXCEPTIONS as e:
             message = str(e).strip("() ") or e.__class__.__name__
             logger.error(f"5xx response from {url}: {message}")
 
-    return False
+    return 500, {}
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import io
-from contextlib import contextmanager
+import uuid
+from contextlib import contextmanager, suppress
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterator, cast
 
 import emoji
 import webp
 from PIL import (
+    ExifTags,
     Image,
     ImageDraw,
     ImageFilter,
@@ -20,8 +23,9 @@ from pilmoji import Pilmoji
 from sanic.log import logger
 
 from .. import settings
-from ..models import Font, Template, Text
+from ..models import Font, Overlay, Template, Text
 from ..types import Align, Dimensions, DrawType, FontType, ImageType, Offset, Point
+from . import pack, renditions
 
 EXCEPTIONS = (
     OSError,
@@ -30,6 +34,8 @@ EXCEPTIONS = (
     UnidentifiedImageError,
 )
 
+_preloaded: dict[Path, tuple[int, ImageType]] = {}
+
 
 def preview(
     template: Template,
@@ -66,11 +72,15 @@ def save(
     maximum_frames: int = 0,
     directory: Path = settings.IMAGES_DIRECTORY,
 ) -> Path:
-    size = fit_image(*size)
+    size = bucket(fit_image(*size))
+    font_name, style, size, watermark, maximum_frames = canonicalize(
+        template, font_name, style, size, watermark, extension, maximum_frames
+    )
 
     path = directory / template.build_path(
         lines, font_name, style, size, watermark, extension, maximum_frames
     )
+    master = None
     if path.exists():
         if settings.DEPLOYED:
             logger.info(f"Loading meme from {path}")
@@ -79,104 +89,428 @@ def save(
     else:
         logger.info(f"Saving meme to {path}")
         path.parent.mkdir(parents=True, exist_ok=True)
-
-    if extension == "gif":
-        frames, duration = render_animation(
+        master = find_master(
             template,
-            style,
             lines,
-            size,
             font_name,
+            style,
+            size,
+            watermark,
+            extension,
             maximum_frames,
-            watermark=watermark,
+            directory,
         )
-        logger.info(f"Saving {len(frames)} frames as GIF at {duration} ms/frame")
-        frames[0].save(
-            path,
-            format=extension,
-            save_all=True,
-            append_images=frames[1:],
-            duration=duration,
-            loop=0,
+
+    # Concurrent renders of the same meme must never serve a partial file
+    temporary = path.with_name(f".{uuid.uuid4().hex}{path.suffix}")
+    try:
+        if master:
+            logger.info(f"Deriving meme from {master}")
+            derive(master, temporary, size)
+        elif extension == "gif":
+            frames, duration = render_animation(
+                template,
+                style,
+                lines,
+                size,
+                font_name,
+                maximum_frames,
+                watermark=watermark,
+            )
+            logger.info(f"Saving {len(frames)} frames as GIF at {duration} ms/frame")
+            frames[0].save(
+                temporary,
+                format=extension,
+                save_all=True,
+                append_images=frames[1:],
+                duration=duration,
+                loop=0,
+            )
+        elif extension == "webp":
+            frames, duration = render_animation(
+                template,
+                style,
+                lines,
+                size,
+                font_name,
+                maximum_frames or settings.MAXIMUM_FRAMES * 4,
+                watermark=watermark,
+            )
+            count = len(frames)
+            fps = round(1 / duration * 1000, 2)
+            logger.info(f"Saving {count} frames as WebP at {fps} frame/s")
+            webp.save_images(frames, str(temporary), fps=fps, lossless=False)
+        else:
+            image = render_image(
+                template, style, lines, size, font_name, watermark=watermark
+            )
+            image.convert("RGB").save(temporary, quality=95)
+        temporary.replace(path)
+    finally:
+        temporary.unlink(missing_ok=True)
+
+    return path
+
+
+def blank(
+    template: Template,
+    style: str = "default",
+    extension: str = settings.DEFAULT_STATIC_EXTENSION,
+    size: Dimensions = (0, 0),
+    *,
+    directory: Path = settings.IMAGES_DIRECTORY,
+) -> Path:
+    size = fit_image(*size)
+    _font_name, style, size, _watermark, _frames = canonicalize(
+        template, "", style, size, "", extension, 0
+    )
+
+    # Shares the path of a full render without text, so either fills the cache
+    path = directory / template.build_path([], "", style, size, "", extension)
+    if path.exists() and settings.DEPLOYED:
+        return path
+    logger.info(f"Saving blank image to {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    pad = all(size)
+    background = load(select(template.get_image(style), size, pad, expand=True))
+    image = resize_image(background, *size, pad, expand=True)
+    if pad:
+        image = add_blurred_background(image, background, *size)
+
+    temporary = path.with_name(f".{uuid.uuid4().hex}{path.suffix}")
+    try:
+        image.convert("RGB").save(temporary, quality=95)
+        temporary.replace(path)
+    finally:
+        temporary.unlink(missing_ok=True)
+
+    return path
+
+
+def canonicalize(
+    template: Template,
+    font_name: str,
+    style: str,
+    size: Dimensions,
+    watermark: str,
+    extension: str,
+    maximum_frames: int,
+) -> tuple[str, str, Dimensions, str, int]:
+    animated = extension in settings.ANIMATED_EXTENSIONS
+
+    if font_name:
+        with suppress(ValueError):
+            font_name = Font.objects.get(font_name).id
+
+    if style == "default" or (style == "animated" and animated):
+        style = ""
+
+    if (
+        any(
+            (
+                size[0] and size[0] <= settings.PREVIEW_SIZE[0],
+                size[1] and size[1] <= settings.PREVIEW_SIZE[1],
+            )
         )
+        and not settings.DEBUG
+    ):
+        watermark = ""
+
+    if not animated:
+        maximum_frames = 0
     elif extension == "webp":
-        frames, duration = render_animation(
+        maximum_frames = maximum_frames or settings.MAXIMUM_FRAMES * 4
+
+    defaults = {(settings.DEFAULT_SIZE[0], 0), (0, settings.DEFAULT_SIZE[1])}
+    if size in defaults or maximum_frames:
+        try:
+            size, maximum_frames = _canonicalize_background(
+                template, style, size, animated, maximum_frames
+            )
+        except EXCEPTIONS as e:
+            logger.warning(f"Unable to canonicalize size: {e}")
+
+    return font_name, style, size, watermark, maximum_frames
+
+
+def _canonicalize_background(
+    template: Template,
+    style: str,
+    size: Dimensions,
+    animated: bool,
+    maximum_frames: int,
+) -> tuple[Dimensions, int]:
+    # Static images expand to fill the default size while animations shrink
+    expand = not animated
+    path = template.get_image(style, animated=animated)
+
+    # Cache paths must not depend on what this process happens to have decoded
+    selected = _select_rendition(path, size, all(size), expand=expand)
+    if animated:
+        dimensions, total = get_frames(selected)
+        if total > 1 and maximum_frames >= total:
+            maximum_frames = total
+    else:
+        dimensions = get_dimensions(selected)
+
+    default = _select_rendition(path, (0, 0), False, expand=expand)
+    if size != (0, 0) and selected == default:
+        resized = get_size(dimensions, *size, False, expand=expand)
+        if resized == get_size(dimensions, 0, 0, False, expand=expand):
+            size = 0, 0
+
+    return size, maximum_frames
+
+
+def bucket(size: Dimensions) -> Dimensions:
+    width, height = size
+    if not settings.SIZE_BUCKETS or bool(width) == bool(height):
+        return size
+    value = min(
+        (value for value in settings.SIZE_BUCKETS if value >= width + height),
+        default=settings.SIZE_BUCKETS[-1],
+    )
+    return (value, 0) if width else (0, value)
+
+
+def find_master(
+    template: Template,
+    lines: list[str],
+    font_name: str,
+    style: str,
+    size: Dimensions,
+    watermark: str,
+    extension: str,
+    maximum_frames: int,
+    directory: Path,
+) -> Path | None:
+    width, height = size
+    if not settings.SIZE_BUCKETS or bool(width) == bool(height):
+        return None
+
+    for value in settings.SIZE_BUCKETS:
+        if value <= width + height:
+            continue
+        _font_name, _style, dimensions, _watermark, frames = canonicalize(
             template,
-            style,
-            lines,
-            size,
             font_name,
-            maximum_frames or settings.MAXIMUM_FRAMES * 4,
-            watermark=watermark,
+            style,
+            (value, 0) if width else (0, value),
+            watermark,
+            extension,
+            maximum_frames,
         )
-        count = len(frames)
-        fps = round(1 / duration * 1000, 2)
-        logger.info(f"Saving {count} frames as WebP at {fps} frame/s")
-        webp.save_images(frames, str(path), fps=fps, lossless=False)
-    else:
-        image = render_image(
-            template, style, lines, size, font_name, watermark=watermark
+        path = directory / template.build_path(
+            lines, font_name, style, dimensions, watermark, extension, frames
         )
-        image.convert("RGB").save(path, quality=95)
+        if path.exists():
+            return path
 
-    return path
+    return None
+
+
+def derive(source: Path, destination: Path, size: Dimensions):
+    image = Image.open(source)
+    size = get_size(image.size, *size, False, expand=True)
+
+    if getattr(image, "n_frames", 1) > 1:
+        duration = image.info.get("duration", 100)
+        frames = [
+            frame.convert("RGBA").resize(size, Image.Resampling.LANCZOS)
+            for frame in ImageSequence.Iterator(image)
+        ]
+        if destination.suffix == ".webp":
+            fps = round(1 / duration * 1000, 2)
+            webp.save_images(frames, str(destination), fps=fps, lossless=False)
+        else:
+            frames[0].save(
+                destination,
+                format="gif",
+                save_all=True,
+                append_images=frames[1:],
+                duration=duration,
+                loop=0,
+            )
+    else:
+        resized = image.convert("RGB").resize(size, Image.Resampling.LANCZOS)
+        resized.save(destination, quality=95)
 
 
 def load(path: Path) -> ImageType:
-    image = Image.open(path).convert("RGBA")
-    image = cast(ImageType, ImageOps.exif_transpose(image))
+    image = pack.lookup(path)
+    if image is None:
+        image = _preloaded_copy(path)
+    if image is None:
+        image = Image.open(path).convert("RGBA")
+        image = cast(ImageType, ImageOps.exif_transpose(image))
     return image
 
 
-def embed(template: Template, index: int, foreground_path: Path, background_path: Path):
-    try:
-        overlay = template.overlay[index]
-    except IndexError:
-        count = len(template.overlay)
-        logger.error(f"Template {template.id!r} only supports {count} overlay(s)")
-        overlay = template.overlay[count - 1]
+def get_dimensions(path: Path) -> Dimensions:
+    # Saves that hit the cache only need the size, so avoid decoding the image
+    image = pack.lookup(path)
+    if image is not None:
+        return image.size
+    return _read_dimensions(path, path.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=1024)
+def _read_dimensions(path: Path, modified: int) -> Dimensions:
+    with Image.open(path) as image:
+        width, height = image.size
+        orientation = image.getexif().get(ExifTags.Base.Orientation)
+    if orientation in {5, 6, 7, 8}:
+        return height, width
+    return width, height
 
-    background = load(background_path)
-    foreground = load(foreground_path)
 
-    size = overlay.get_size(background.size)
-    foreground = resize_image(foreground, *size, expand=True)
-    foreground = foreground.rotate(overlay.angle, expand=True)
+def get_frames(path: Path) -> tuple[Dimensions, int]:
+    # Counting frames seeks through the whole animation, so only do it once
+    return _read_frames(path, path.stat().st_mtime_ns)
 
-    x1, y1, _x2, _y2 = overlay.get_box(background.size, foreground.size)
-    background.paste(foreground, (x1, y1), mask=foreground.convert("RGBA"))
 
-    background.convert("RGB").save(background_path)
+@lru_cache(maxsize=1024)
+def _read_frames(path: Path, modified: int) -> tuple[Dimensions, int]:
+    with Image.open(path) as image:
+        return image.size, getattr(image, "n_frames", 1)
 
 
-def merge(template: Template, index: int, foreground_path: Path, background_path: Path):
+def preload(path: Path) -> bool:
+    if pack.lookup(path):
+        return False
+    modified = path.stat().st_mtime_ns
+    image = Image.open(path).convert("RGBA")
+    image = cast(ImageType, ImageOps.exif_transpose(image))
+    image.load()
+    _preloaded[path] = modified, image
+    return True
+
+
+def _preloaded_copy(path: Path) -> ImageType | None:
+    entry = _preloaded.get(path)
+    if not entry:
+        return None
+    with suppress(FileNotFoundError):
+        if path.stat().st_mtime_ns == entry[0]:
+            return entry[1].copy()
+    del _preloaded[path]
+    return None
+
+
+def select(path: Path, size: Dimensions, pad: bool, *, expand: bool) -> Path:
+    # Packed and preloaded backgrounds are keyed by the original path and are
+    # already decoded, which beats reading even a smaller rendition from disk
+    if path in _preloaded or pack.lookup(path) is not None:
+        return path
+    return _select_rendition(path, size, pad, expand=expand)
+
+
+def _select_rendition(path: Path, size: Dimensions, pad: bool, *, expand: bool) -> Path:
+    for dimensions, rendition in renditions.lookup(path):
+        width, height = get_size(dimensions, *size, pad, expand=expand)
+        if dimensions[0] >= width and dimensions[1] >= height:
+            logger.debug(f"Selected {dimensions} rendition of {path}")
+            return rendition
+    return path
+
+
+def get_overlay(template: Template, index: int) -> Overlay:
     try:
-        overlay = template.overlay[index]
+        return template.overlay[index]
     except IndexError:
         count = len(template.overlay)
         logger.error(f"Template {template.id!r} only supports {count} overlay(s)")
-        overlay = template.overlay[count - 1]
+        return template.overlay[count - 1]
 
-    background = Image.open(background_path)
-    foreground = load(foreground_path)
 
-    frames = []
-    for frame in ImageSequence.Iterator(background):
-        stream = io.BytesIO()
-        frame.save(stream, format="GIF")
-        background = Image.open(stream).convert("RGBA")  # type: ignore[assignment]
+def load_overlays(
+    foreground_paths: list[tuple[int, Path]],
+) -> list[tuple[int, ImageType]]:
+    foregrounds = []
+    for index, path in foreground_paths:
+        try:
+            foregrounds.append((index, load(path)))
+        except EXCEPTIONS as e:
+            logger.error(e)
+    return foregrounds
 
-        size = overlay.get_size(background.size)
-        foreground.thumbnail(size)
+
+def prepare_overlays(
+    template: Template,
+    foregrounds: list[tuple[int, ImageType]],
+    background_size: Dimensions,
+) -> list[tuple[ImageType, Point]]:
+    layers = []
+    for index, foreground in foregrounds:
+        overlay = get_overlay(template, index)
+
+        size = overlay.get_size(background_size)
+        foreground = resize_image(foreground, *size, expand=True)
         foreground = foreground.rotate(overlay.angle, expand=True)
 
-        x1, y1, _x2, _y2 = overlay.get_box(background.size, foreground.size)
-        background.paste(foreground, (x1, y1), mask=foreground.convert("RGBA"))
+        x1, y1, _x2, _y2 = overlay.get_box(background_size, foreground.size)
+        layers.append((foreground, (x1, y1)))
+    return layers
+
+
+def embed(
+    template: Template,
+    foreground_paths: list[tuple[int, Path]],
+    background_path: Path,
+    destination_path: Path,
+) -> int:
+    foregrounds = load_overlays(foreground_paths)
+    if not foregrounds:
+        return 0
+
+    background = load(background_path)
+
+    for foreground, point in prepare_overlays(template, foregrounds, background.size):
+        background.paste(foreground, point, mask=foreground)
 
-        frames.append(background)
+    logger.debug(f"Embedded {len(foregrounds)} overlay(s) onto custom background")
+    background.convert("RGB").save(destination_path)
 
-    logger.debug(f"Merging {len(frames)} frame(s) for custom GIF background")
-    frames[0].save(background_path, save_all=True, append_images=frames[1:])
+    return len(foregrounds)
+
+
+def merge(
+    template: Template,
+    foreground_paths: list[tuple[int, Path]],
+    background_path: Path,
+    destination_path: Path,
+) -> int:
+    foregrounds = load_overlays(foreground_paths)
+    if not foregrounds:
+        return 0
+
+    background = Image.open(background_path)
+    layers = prepare_overlays(template, foregrounds, background.size)
+    duration = background.info.get("duration", 100)
+
+    def composite() -> Iterator[ImageType]:
+        for frame in ImageSequence.Iterator(background):
+            image = frame.convert("RGBA")
+            for foreground, point in layers:
+                image.paste(foreground, point, mask=foreground)
+            image.info["duration"] = frame.info.get("duration", duration)
+            yield image
+
+    frames = composite()
+    options = {"loop": background.info["loop"]} if "loop" in background.info else {}
+
+    count = getattr(background, "n_frames", 1)
+    logger.debug(f"Merging {count} frame(s) for custom GIF background")
+    next(frames).save(
+        destination_path,
+        format="GIF",
+        save_all=True,
+        append_images=frames,
+        **options,
+    )
+
+    return len(foregrounds)
 
 
 def pad_top(source_path: Path, destination_path: Path):
@@ -221,9 +555,8 @@ def render_image(
     is_preview: bool = False,
     watermark: str = "",
 ) -> ImageType:
-    background = load(template.get_image(style))
-
     pad = all(size) if pad is None else pad
+    background = load(select(template.get_image(style), size, pad, expand=True))
     image = resize_image(background, *size, pad, expand=True)
     if any(
         (
@@ -317,7 +650,8 @@ def render_animation(
     frames = []
 
     pad = all(size) if pad is None else pad
-    source = Image.open(template.get_image(style, animated=True))
+    path = template.get_image(style, animated=True)
+    source = Image.open(select(path, size, pad, expand=False))
     duration = source.info.get("duration", 100)
     total = getattr(source, "n_frames", 1)
     if total > 1:
@@ -441,7 +775,15 @@ def render_animation(
 def resize_image(
     image: ImageType, width: int, height: int, pad: bool = True, *, expand: bool
 ) -> ImageType:
-    ratio = image.width / image.height
+    size = get_size(image.size, width, height, pad, expand=expand)
+    image = image.resize(size, Image.Resampling.LANCZOS)
+    return image
+
+
+def get_size(
+    dimensions: Dimensions, width: int, height: int, pad: bool = True, *, expand: bool
+) -> Dimensions:
+    ratio = dimensions[0] / dimensions[1]
     default_width, default_height = settings.DEFAULT_SIZE
 
     if pad:
@@ -464,8 +806,7 @@ def resize_image(
         else:
             size = default_width, int(default_height / ratio)
 
-    image = image.resize(size, Image.Resampling.LANCZOS)
-    return image
+    return size
 
 
 def fit_image(width: float, height: float) -> tuple[int, int]:
@@ -696,12 +1037,12 @@ def split_3(line: str) -> str:
 def get_font(
     name: str, text: str, max_text_size: Dimensions, max_font_size: int
 ) -> FontType:
-    font_path = Font.objects.get(name or settings.DEFAULT_FONT).path
+    font_path = str(Font.objects.get(name or settings.DEFAULT_FONT).path)
     max_text_width = max_text_size[0] - max_text_size[0] / 35
     max_text_height = max_text_size[1] - max_text_size[1] / 10
 
     for size in range(max(settings.MINIMUM_FONT_SIZE, max_font_size), 6, -1):
-        font = ImageFont.truetype(str(font_path), size=size)
+        font = load_font(font_path, size)
         text_width, text_height = get_text_size_minus_font_offset(text, font)
         if text_width <= max_text_width and text_height <= max_text_height:
             break
@@ -709,6 +1050,11 @@ def get_font(
     return font
 
 
+@lru_cache(maxsize=1024)
+def load_font(path: str, size: int) -> FontType:
+    return ImageFont.truetype(path, size=size)
+
+
 def get_text_size_minus_font_offset(text: str, font: FontType) -> Dimensions:
     text_width, text_height = get_text_size(text, font)
     x_offset, y_offset, _, _ = font.getbbox(text)
@@ -1,12 +1,13 @@
+import asyncio
 from pathlib import Path
+from typing import Any
 
 import aiohttp
-from aiocache import cached
 from sanic.log import logger
 from sanic.request import Request
 
 from .. import settings
-from . import http, urls
+from . import breakers, cache, http, signing, tracking, urls
 
 
 def version() -> str:
@@ -15,10 +16,10 @@ def version() -> str:
     return version_heading.split(" ", maxsplit=1)[1]
 
 
-@cached(
-    60 * 15 if settings.DEPLOYED else 5,
-    key_builder=lambda _func, request: f"{request.args=} {request.headers=}",
-)
+_auth = cache.Cache("auth", settings.AUTH_CACHE_PATH)
+_search = cache.Cache("search")
+
+
 async def authenticate(request: Request) -> dict:
     info: dict = {}
     if settings.REMOTE_TRACKING_URL:
@@ -28,19 +29,23 @@ async def authenticate(request: Request) -> dict:
 
     api_key = _get_api_key(request)
     if api_key:
+        key = f"authenticate:{api_key}"
+        hit, cached = await _auth.fetch(key)
+        if hit:
+            return cached
+
         api_mask = api_key[:2] + "***" + api_key[-2:]
         logger.info(f"Authenticating with API key: {api_mask}")
-        async with aiohttp.ClientSession() as session:
-            response = await session.get(api, headers={"X-API-KEY": api_key})
-            if response.status >= 500:
-                settings.REMOTE_TRACKING_ERRORS += 1
-            else:
-                info = await response.json()
+        status, data = await _request(
+            "auth", "GET", api, headers={"X-API-KEY": api_key}
+        )
+        if status < 500:
+            info = data
+            await _auth.store(key, info, _get_ttl(_is_valid(info)))
 
     return info
 
 
-@cached(60 * 15 if settings.DEPLOYED else 5)
 async def tokenize(request: Request, url: str) -> tuple[str, bool]:
     api_key = _get_api_key(request) or ""
     token = request.args.get("token")
@@ -52,22 +57,36 @@ async def tokenize(request: Request, url: str) -> tuple[str, bool]:
         logger.warning(f"Example API key used to tokenize: {url}")
         return default_url, True
 
+    if settings.SIGNING_KEYS:
+        if signing.verify(url):
+            return url, False
+        if api_key and _is_valid(await authenticate(request)):
+            signed_url = signing.sign(default_url)
+            return signed_url, signed_url != url
+
     if settings.REMOTE_TRACKING_URL:
         api = settings.REMOTE_TRACKING_URL + "tokenize"
     else:
         return url, False
 
     if api_key or token:
-        async with aiohttp.ClientSession() as session:
-            response = await session.post(
-                api, data={"url": default_url}, headers={"X-API-KEY": api_key}
-            )
-            if response.status >= 500:
-                settings.REMOTE_TRACKING_ERRORS += 1
-                return default_url, False
+        key = f"tokenize:{api_key}:{token}:{default_url}"
+        hit, cached = await _auth.fetch(key)
+        if hit:
+            return cached, cached != url
+
+        status, data = await _request(
+            "tokenize",
+            "POST",
+            api,
+            data={"url": default_url},
+            headers={"X-API-KEY": api_key},
+        )
+        if status >= 500:
+            return default_url, False
 
-            data = await response.json()
-            return data["url"], data["url"] != url
+        await _auth.store(key, data["url"], _get_ttl(data["url"] == default_url))
+        return data["url"], data["url"] != url
 
     return url, False
 
@@ -77,6 +96,9 @@ async def custom_watermarks_allowed(request: Request) -> bool:
     if info.get("image_access", False):
         return True
 
+    if settings.SIGNING_KEYS and signing.verify(request.url):
+        return True
+
     token = request.args.get("token")
     if token:
         logger.info(f"Authenticating with token: {token}")
@@ -106,10 +128,8 @@ async def get_watermark(request: Request) -> tuple[str, bool]:
     return settings.DEFAULT_WATERMARK, False
 
 
-async def track(request: Request, lines: list[str]):
-    if settings.TRACK_REQUESTS and settings.REMOTE_TRACKING_URL:
-        api = settings.REMOTE_TRACKING_URL
-    else:
+def track(request: Request, lines: list[str]):
+    if not (settings.TRACK_REQUESTS and settings.REMOTE_TRACKING_URL):
         return
 
     text = " ".join(lines).strip()
@@ -118,26 +138,15 @@ async def track(request: Request, lines: list[str]):
     referer = _get_referer(request) or settings.BASE_URL
     if referer in settings.REMOTE_TRACKING_URL:
         return
-    if any(name in request.args for name in ["height", "width", "watermark", "token"]):
+    if any(
+        name in request.args
+        for name in ["height", "width", "watermark", "token", "signature"]
+    ):
         return
 
-    async with aiohttp.ClientSession() as session:
-        params = dict(text=text, referer=referer, result=urls.clean(request.url))
-        logger.info(f"Tracking request: {params}")
-        headers = {"X-API-KEY": _get_api_key(request) or ""}
-        status, message = await http.fetch(api, params=params, headers=headers)
-        if status != 200:
-            logger.error(f"Tracker response {status}: {message}")
-        if status >= 404 and status not in {414, 421, 520}:
-            settings.REMOTE_TRACKING_ERRORS += 1
-
-    if settings.REMOTE_TRACKING_ERRORS:
-        logger.info(f"Tracker error count: {settings.REMOTE_TRACKING_ERRORS}")
-        if settings.REMOTE_TRACKING_ERRORS >= settings.REMOTE_TRACKING_ERRORS_LIMIT:
-            settings.TRACK_REQUESTS = False
-            logger.warning(
-                f"Disabled tracking after {settings.REMOTE_TRACKING_ERRORS_LIMIT}+ errors"
-            )
+    params = dict(text=text, referer=referer, result=urls.clean(request.url))
+    logger.info(f"Tracking request: {params}")
+    tracking.enqueue(tracking.Event(params, _get_api_key(request) or ""))
 
 
 async def search(request: Request, text: str, safe: bool, *, mode="") -> list[dict]:
@@ -146,26 +155,64 @@ async def search(request: Request, text: str, safe: bool, *, mode="") -> list[di
     else:
         return []
 
-    async with aiohttp.ClientSession() as session:
-        params = dict(
-            text=text,
-            nsfw=0 if safe else 1,
-            referer=_get_referer(request) or settings.BASE_URL,
-            count=5 if mode else 1,
-        )
-        logger.info(f"Searching for results: {text!r} (safe={safe})")
-        headers = {"X-API-KEY": _get_api_key(request) or ""}
-        response = await session.get(api, params=params, headers=headers)  # type: ignore[arg-type]
-        if response.status >= 500:
-            settings.REMOTE_TRACKING_ERRORS += 1
-            return []
+    key = f"{mode}:{int(safe)}:{text}"
+    hit, cached = await _search.fetch(key)
+    if hit:
+        logger.info(f"Using cached results: {text!r} (safe={safe})")
+        return cached
+
+    params = dict(
+        text=text,
+        nsfw=0 if safe else 1,
+        referer=_get_referer(request) or settings.BASE_URL,
+        count=5 if mode else 1,
+    )
+    logger.info(f"Searching for results: {text!r} (safe={safe})")
+    headers = {"X-API-KEY": _get_api_key(request) or ""}
+    status, data = await _request(
+        mode or "search", "GET", api, params=params, headers=headers
+    )
+    if status == 200:
+        await _search.store(key, data, settings.SEARCH_CACHE_TTL)
+        return data
+
+    if status < 500:
+        logger.error(f"Search response: {data}")
+    return []
 
-        data = await response.json()
-        if response.status == 200:
-            return data
 
-        logger.error(f"Search response: {data}")
-        return []
+async def _request(name: str, method: str, url: str, **kwargs) -> tuple[int, Any]:
+    breaker = breakers.get(name)
+    if not breaker.allow():
+        return 503, {}
+
+    timeout = aiohttp.ClientTimeout(settings.REMOTE_TRACKING_TIMEOUT)
+    try:
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.request(method, url, **kwargs) as response:
+                status = response.status
+                data = await response.json(content_type=None)
+    except (*http.EXCEPTIONS, ValueError) as e:
+        message = str(e).strip("() ") or e.__class__.__name__
+        logger.error(f"Remote {name} request failed: {message}")
+        status, data = 503, {}
+    except asyncio.CancelledError:
+        breaker.release()
+        raise
+
+    breaker.record(status < 500)
+    return status, data
+
+
+def _is_valid(info: dict) -> bool:
+    return bool(info) and "error" not in info
+
+
+def _get_ttl(valid: bool) -> int:
+    if valid:
+        return settings.AUTH_CACHE_TTL
+    # Rejected credentials may be fixed soon, so recheck them sooner
+    return settings.AUTH_CACHE_NEGATIVE_TTL
 
 
 def _get_referer(request: Request):
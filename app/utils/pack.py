@@ -0,0 +1,129 @@
+import json
+import math
+import mmap
+import struct
+import uuid
+from pathlib import Path
+
+from PIL import Image, ImageOps
+from sanic.log import logger
+
+from .. import settings
+
+MAGIC = b"MEMEPACK1"
+FOOTER = struct.Struct("<Q")
+EXTENSIONS = {"." + extension for extension in settings.ALLOWED_EXTENSIONS}
+
+_pack: "Pack | None" = None
+
+
+class Pack:
+    def __init__(self, path: Path):
+        with path.open("rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"Invalid pack: {path}")
+        (length,) = FOOTER.unpack_from(self._data, len(self._data) - FOOTER.size)
+        end = len(self._data) - FOOTER.size
+        self.index: dict[str, dict] = json.loads(self._data[end - length : end])
+        self._view = memoryview(self._data)
+
+    def __len__(self):
+        return len(self.index)
+
+    def get(self, path: Path) -> Image.Image | None:
+        entry = self.index.get(key(path))
+        if not entry:
+            return None
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        if [stat.st_mtime_ns, stat.st_size] != entry["source"]:
+            return None
+        start = entry["offset"]
+        buffer = self._view[start : start + entry["length"]]
+        # Shares the mapped pages; Pillow copies before any in-place change
+        return Image.frombuffer(
+            "RGBA", tuple(entry["size"]), buffer, "raw", "RGBA", 0, 1  # type: ignore[arg-type]
+        )
+
+
+def key(path: Path) -> str:
+    try:
+        return str(path.relative_to(settings.ROOT))
+    except ValueError:
+        return ""
+
+
+def get(path: Path | None = None) -> Pack | None:
+    global _pack
+    path = path or settings.PACK_PATH
+    if _pack is None and path.exists():
+        try:
+            _pack = Pack(path)
+        except (OSError, ValueError) as e:
+            logger.error(e)
+        else:
+            logger.info(f"Mapped {len(_pack)} background(s) from {path}")
+    return _pack
+
+
+def lookup(path: Path) -> Image.Image | None:
+    pack = get()
+    return pack.get(path) if pack else None
+
+
+def decode(path: Path) -> Image.Image:
+    image = Image.open(path).convert("RGBA")
+    image = ImageOps.exif_transpose(image) or image
+    pixels = image.width * image.height
+    if pixels > settings.MAXIMUM_PIXELS:
+        scale = math.sqrt(settings.MAXIMUM_PIXELS / pixels)
+        size = int(image.width * scale), int(image.height * scale)
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    return image
+
+
+def backgrounds(root: Path = settings.TEMPLATES_DIRECTORY) -> list[Path]:
+    paths = []
+    for path in sorted(root.glob("*/*")):
+        if path.parent.name[0] in {".", "_"} or path.name[0] in {".", "_"}:
+            continue
+        if path.suffix.lower() in EXTENSIONS:
+            paths.append(path)
+    return paths
+
+
+def build(
+    destination: Path = settings.PACK_PATH, root: Path = settings.TEMPLATES_DIRECTORY
+) -> int:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    temporary = destination.with_name(f".{destination.name}.{uuid.uuid4().hex}")
+
+    index: dict[str, dict] = {}
+    with temporary.open("wb") as f:
+        f.write(MAGIC)
+        for path in backgrounds(root):
+            try:
+                image = decode(path)
+            except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+                logger.warning(f"Skipped {path}: {e}")
+                continue
+            data = image.tobytes()
+            stat = path.stat()
+            index[key(path)] = {
+                "offset": f.tell(),
+                "length": len(data),
+                "size": list(image.size),
+                "source": [stat.st_mtime_ns, stat.st_size],
+            }
+            f.write(data)
+        footer = json.dumps(index).encode()
+        f.write(footer + FOOTER.pack(len(footer)))
+
+    # Replacing keeps packs that are already mapped valid in running workers
+    temporary.replace(destination)
+
+    logger.info(f"Packed {len(index)} background(s) into {destination}")
+    return len(index)
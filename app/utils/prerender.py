@@ -0,0 +1,75 @@
+import asyncio
+from collections import OrderedDict
+from contextlib import suppress
+from typing import Awaitable, Callable
+
+from sanic.log import logger
+
+from .. import settings
+
+Job = Callable[[], Awaitable]
+
+COUNTS = {"queued": 0, "rendered": 0, "failed": 0, "dropped": 0}
+
+_queue: OrderedDict[str, Job] = OrderedDict()
+_worker: asyncio.Task | None = None
+_wakeup: asyncio.Event | None = None
+
+
+def enqueue(key: str, job: Job):
+    if key in _queue:
+        # Only the latest job for a key is worth rendering, e.g. while typing
+        del _queue[key]
+    elif len(_queue) >= settings.PRERENDER_QUEUE_SIZE:
+        _queue.popitem(last=False)
+        COUNTS["dropped"] += 1
+    _queue[key] = job
+    COUNTS["queued"] += 1
+
+    with suppress(RuntimeError):
+        start()
+        if _wakeup:
+            _wakeup.set()
+
+
+def start():
+    global _worker, _wakeup
+    loop = asyncio.get_running_loop()
+    if _worker and not _worker.done() and _worker.get_loop() is loop:
+        return
+    _wakeup = asyncio.Event()
+    _worker = loop.create_task(_run(_wakeup))
+
+
+async def stop():
+    global _worker
+    if _worker:
+        _worker.cancel()
+        with suppress(asyncio.CancelledError):
+            await _worker
+        _worker = None
+    _queue.clear()
+
+
+async def drain() -> int:
+    count = 0
+    while _queue:
+        key, job = _queue.popitem(last=False)
+        try:
+            await job()
+        except Exception:
+            # One bad render must not stop the worker from draining the rest
+            logger.exception(f"Unable to pre-render {key}")
+            COUNTS["failed"] += 1
+        else:
+            COUNTS["rendered"] += 1
+        count += 1
+    return count
+
+
+async def _run(wakeup: asyncio.Event):
+    # A single worker keeps pre-rendering from competing with requests
+    while True:
+        await wakeup.wait()
+        wakeup.clear()
+        await drain()
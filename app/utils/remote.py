@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from contextlib import suppress
+from pathlib import Path
+
+from anyio import Path as AsyncPath
+from sanic.log import logger
+
+from .. import settings
+from . import http, text
+
+_pending: dict[str, asyncio.Task] = {}
+
+
+def get_record_path(url: str) -> Path:
+    filename = text.fingerprint(url, prefix="", suffix=".json")
+    return settings.DOWNLOADS_DIRECTORY / "urls" / filename
+
+
+def get_blob_path(digest: str) -> Path:
+    return settings.DOWNLOADS_DIRECTORY / "blobs" / digest[:2] / digest
+
+
+def read(url: str) -> dict:
+    with suppress(FileNotFoundError, ValueError):
+        return json.loads(get_record_path(url).read_text())
+    return {}
+
+
+def write(url: str, record: dict):
+    path = get_record_path(url)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+    temporary.write_text(json.dumps(record))
+    temporary.replace(path)
+
+
+def lookup(url: str) -> Path | None:
+    record = read(url)
+    if record:
+        path = get_blob_path(record["digest"])
+        with suppress(FileNotFoundError):
+            os.utime(path)
+            return path
+    return None
+
+
+def digest(url: str) -> str:
+    return read(url).get("digest", "")
+
+
+def expired(url: str) -> bool:
+    record = read(url)
+    if not record:
+        return False
+    return time.time() - record.get("checked", 0) >= settings.REMOTE_IMAGES_TTL
+
+
+async def fetch(url: str, *, force: bool = False) -> Path | None:
+    if not force and not expired(url):
+        path = lookup(url)
+        if path:
+            logger.info(f"Found remote image {url} at {path}")
+            return path
+
+    task = _pending.get(url)
+    if not task:
+        task = _pending[url] = asyncio.create_task(_download(url))
+        task.add_done_callback(lambda _task: _pending.pop(url, None))
+    return await asyncio.shield(task)
+
+
+async def _download(url: str) -> Path | None:
+    directory = AsyncPath(settings.DOWNLOADS_DIRECTORY / "tmp")
+    await directory.mkdir(parents=True, exist_ok=True)
+    temporary = directory / uuid.uuid4().hex
+
+    record = read(url)
+    cached = lookup(url)
+    headers = {}
+    if cached and record.get("etag"):
+        headers["If-None-Match"] = record["etag"]
+    if cached and record.get("last_modified"):
+        headers["If-Modified-Since"] = record["last_modified"]
+
+    if headers:
+        logger.info(f"Revalidating remote image {url}")
+    else:
+        logger.info(f"Downloading remote image {url}")
+    status, validators = await http.download(url, temporary, headers=headers)
+
+    if status == 200:
+        return await asyncio.to_thread(store, url, Path(temporary), validators)
+
+    await temporary.unlink(missing_ok=True)
+    if cached:
+        if status != 304:
+            logger.warning(f"Using stale remote image {url} at {cached}")
+        # Failed checks wait out the TTL too rather than retrying every request
+        write(url, record | {"checked": time.time()})
+    return cached
+
+
+def store(url: str, source: Path, validators: dict[str, str] | None = None) -> Path:
+    hasher = hashlib.sha256()
+    with source.open("rb") as f:
+        while chunk := f.read(1024 * 64):
+            hasher.update(chunk)
+
+    path = get_blob_path(hasher.hexdigest())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        logger.info(f"Deduplicated remote image {url} as {path}")
+        source.unlink()
+        os.utime(path)
+    else:
+        source.replace(path)
+
+    record = {"url": url, "digest": hasher.hexdigest(), "checked": time.time()}
+    write(url, record | (validators or {}))
+    return path
+
+
+def discard(url: str):
+    record = read(url)
+    get_record_path(url).unlink(missing_ok=True)
+    if record:
+        # Templates keep their own hard links, so only the shared copy is removed
+        get_blob_path(record["digest"]).unlink(missing_ok=True)
+
+
+def link(source: Path, destination: Path):
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    temporary = destination.with_name(f".{destination.name}.{uuid.uuid4().hex}")
+    try:
+        os.link(source, temporary)
+    except OSError:
+        shutil.copyfile(source, temporary)
+    temporary.replace(destination)
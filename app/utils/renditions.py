@@ -0,0 +1,150 @@
+import json
+import shutil
+from contextlib import suppress
+from pathlib import Path
+
+from PIL import Image, ImageOps, ImageSequence
+from sanic.log import logger
+
+from .. import settings
+from ..types import Dimensions
+
+INDEX = "index.json"
+
+_indexes: dict[Path, tuple[int, dict]] = {}
+
+
+def get_directory(path: Path) -> Path:
+    return settings.RENDITIONS_DIRECTORY / path.parent.name
+
+
+def read(directory: Path) -> dict:
+    try:
+        modified = (directory / INDEX).stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+
+    cached = _indexes.get(directory)
+    if cached and cached[0] == modified:
+        return cached[1]
+
+    with suppress(ValueError):
+        _indexes[directory] = modified, json.loads((directory / INDEX).read_text())
+        return _indexes[directory][1]
+    return {}
+
+
+def lookup(path: Path) -> list[tuple[Dimensions, Path]]:
+    directory = get_directory(path)
+    entry = read(directory).get(path.name)
+    if not entry:
+        return []
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return []
+    if [stat.st_mtime_ns, stat.st_size] != entry["source"]:
+        return []
+    return [(tuple(size), directory / name) for size, name in entry["renditions"]]
+
+
+def get_sizes(dimensions: Dimensions) -> list[Dimensions]:
+    width, height = dimensions
+    limit = min(width, height)
+    sizes = []
+    targets = [
+        min(settings.PREVIEW_SIZE),
+        min(settings.DEFAULT_SIZE),
+        min(settings.DEFAULT_SIZE) * settings.RENDITIONS_SCALE,
+    ]
+    for target in targets:
+        if target >= limit:
+            break
+        scale = target / limit
+        sizes.append((round(width * scale), round(height * scale)))
+    return sizes
+
+
+def get_frames(image: Image.Image) -> tuple[list[Image.Image], int]:
+    total = getattr(image, "n_frames", 1)
+    duration = image.info.get("duration", 100)
+    maximum = settings.MAXIMUM_FRAMES * 4
+    step = max(1.0, total / maximum)
+    frames: list[Image.Image] = []
+    for index, frame in enumerate(ImageSequence.Iterator(image)):
+        if index >= len(frames) * step:
+            frames.append(frame.convert("RGBA"))
+    # Keep the playback speed the same with fewer frames
+    return frames, round(duration * total / len(frames))
+
+
+def write(source: Path, destination: Path, size: Dimensions):
+    image = Image.open(source)
+    if source.suffix == ".gif" and getattr(image, "n_frames", 1) > 1:
+        frames, duration = get_frames(image)
+        frames = [frame.resize(size, Image.Resampling.LANCZOS) for frame in frames]
+        frames[0].save(
+            destination,
+            save_all=True,
+            append_images=frames[1:],
+            duration=duration,
+            loop=image.info.get("loop", 0),
+            disposal=2,
+        )
+        return
+
+    converted = image.convert("RGBA")
+    converted = ImageOps.exif_transpose(converted) or converted
+    resized = converted.resize(size, Image.Resampling.LANCZOS)
+    if destination.suffix == ".jpg":
+        resized.convert("RGB").save(destination, quality=95)
+    else:
+        resized.save(destination, optimize=True)
+
+
+def ingest(source: Path) -> dict:
+    image = Image.open(source)
+    frames = getattr(image, "n_frames", 1)
+    dimensions = (ImageOps.exif_transpose(image) or image).size
+    directory = get_directory(source)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    suffix = source.suffix.lower()
+    if suffix == ".jpeg":
+        suffix = ".jpg"
+    elif suffix not in {".jpg", ".gif"}:
+        suffix = ".png"
+
+    renditions = []
+    for size in get_sizes(dimensions):
+        name = f"{source.stem}.{size[0]}x{size[1]}{suffix}"
+        write(source, directory / name, size)
+        renditions.append([list(size), name])
+
+    if suffix == ".gif" and frames > settings.MAXIMUM_FRAMES * 4:
+        name = f"{source.stem}.{dimensions[0]}x{dimensions[1]}{suffix}"
+        write(source, directory / name, dimensions)
+        renditions.append([list(dimensions), name])
+
+    stat = source.stat()
+    return {"source": [stat.st_mtime_ns, stat.st_size], "renditions": renditions}
+
+
+def build(directory: Path) -> int:
+    index = {}
+    destination = settings.RENDITIONS_DIRECTORY / directory.name
+    shutil.rmtree(destination, ignore_errors=True)
+    for source in sorted(directory.iterdir()):
+        if source.name[0] in {".", "_"} or len(source.suffixes) > 1:
+            continue
+        if source.suffix.lower().strip(".") not in settings.ALLOWED_EXTENSIONS:
+            continue
+        try:
+            index[source.name] = ingest(source)
+        except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+            logger.error(f"Unable to ingest {source}: {e}")
+
+    if index:
+        destination.mkdir(parents=True, exist_ok=True)
+        (destination / INDEX).write_text(json.dumps(index))
+    return sum(len(entry["renditions"]) for entry in index.values())
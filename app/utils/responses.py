@@ -0,0 +1,103 @@
+import asyncio
+import gzip
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from sanic import response
+from sanic.request import Request
+from sanic.response import HTTPResponse
+
+from .. import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+@dataclass(frozen=True)
+class Entry:
+    body: bytes
+    etag: str
+    encodings: dict[str, bytes]
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+_cache: OrderedDict[tuple, Entry] = OrderedDict()
+
+
+def encode(data: Any, headers: dict[str, str] | None = None) -> Entry:
+    body = response.json(data).body or b""
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    encodings = {"gzip": gzip.compress(body, mtime=0)}
+    if brotli:
+        encodings["br"] = brotli.compress(body)
+    return Entry(body, etag, encodings, headers or {})
+
+
+def clear():
+    _cache.clear()
+
+
+async def json(
+    request: Request,
+    *key,
+    build: Callable[[], Any],
+    version: int = 0,
+    headers: dict[str, str] | None = None,
+) -> HTTPResponse:
+    entry = await _lookup(request, key, lambda: (build(), {}), version)
+    return send(request, entry, headers)
+
+
+async def page(
+    request: Request,
+    *key,
+    build: Callable[[], tuple[Any, dict[str, str]]],
+    version: int = 0,
+) -> HTTPResponse:
+    # Headers describing the page are cached with it, e.g. totals and links
+    entry = await _lookup(request, key, build, version)
+    return send(request, entry, entry.headers)
+
+
+async def _lookup(
+    request: Request,
+    key: tuple,
+    build: Callable[[], tuple[Any, dict[str, str]]],
+    version: int,
+) -> Entry:
+    key = (request.scheme, request.host, request.path, version, *key)
+    entry = _cache.get(key)
+    if entry:
+        _cache.move_to_end(key)
+    else:
+        data, headers = await asyncio.to_thread(build)
+        entry = _cache[key] = await asyncio.to_thread(encode, data, headers)
+        while len(_cache) > settings.RESPONSE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return entry
+
+
+def send(
+    request: Request, entry: Entry, extra: dict[str, str] | None = None
+) -> HTTPResponse:
+    headers = {"ETag": entry.etag, "Vary": "Accept-Encoding", **(extra or {})}
+
+    matches = [
+        tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")
+    ]
+    if entry.etag in matches or "*" in matches:
+        return HTTPResponse(status=304, headers=headers)
+
+    body = entry.body
+    accepted = request.headers.get("Accept-Encoding", "")
+    for encoding in ("br", "gzip"):
+        if encoding in accepted and encoding in entry.encodings:
+            headers["Content-Encoding"] = encoding
+            body = entry.encodings[encoding]
+            break
+
+    return HTTPResponse(body, headers=headers, content_type="application/json")
@@ -0,0 +1,63 @@
+import base64
+import hashlib
+import hmac
+import time
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+from sanic.log import logger
+
+from .. import settings
+
+PARAMS = ("expires", "key_id", "signature")
+
+
+def canonicalize(url: str) -> str:
+    parts = urlsplit(url)
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name != "signature"
+    )
+    return unquote(parts.path) + "?" + urlencode(query)
+
+
+def digest(secret: str, message: str) -> str:
+    mac = hmac.new(secret.encode(), message.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(mac).decode().rstrip("=")
+
+
+def sign(url: str, *, key_id: str = "", ttl: int = 0) -> str:
+    key_id = key_id or next(iter(settings.SIGNING_KEYS))
+    expires = int(time.time()) + (ttl or settings.SIGNING_TTL)
+    parts = urlsplit(url)
+    query = [
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name not in PARAMS
+    ]
+    query += [("expires", str(expires)), ("key_id", key_id)]
+    url = parts._replace(query=urlencode(query)).geturl()
+    signature = digest(settings.SIGNING_KEYS[key_id], canonicalize(url))
+    return f"{url}&signature={signature}"
+
+
+def verify(url: str) -> bool | None:
+    params = dict(parse_qsl(urlsplit(url).query, keep_blank_values=True))
+    if "signature" not in params:
+        return None
+
+    secret = settings.SIGNING_KEYS.get(params.get("key_id", ""))
+    if not secret:
+        logger.warning(f"Unknown signing key: {params.get('key_id')}")
+        return False
+
+    try:
+        expires = int(params.get("expires", ""))
+    except ValueError:
+        return False
+    if expires < time.time():
+        logger.info(f"Expired signature: {url}")
+        return False
+
+    expected = digest(secret, canonicalize(url))
+    return hmac.compare_digest(expected, params["signature"])
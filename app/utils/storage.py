@@ -0,0 +1,153 @@
+import shutil
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager, suppress
+from pathlib import Path
+
+from sanic.log import logger
+
+from .. import settings
+
+ACCESS_MARKER = ".access"
+
+_active: Counter[Path] = Counter()
+_sizes: dict[Path, tuple[int, int]] = {}
+_listings: dict[Path, tuple[int, dict[str, list[Path]]]] = {}
+_evicted_at = 0.0
+
+
+def touch(directory: Path):
+    with suppress(FileNotFoundError):
+        (directory / ACCESS_MARKER).touch()
+
+
+@contextmanager
+def using(directory: Path):
+    _active[directory] += 1
+    try:
+        yield directory
+    finally:
+        _active[directory] -= 1
+        if _active[directory] <= 0:
+            del _active[directory]
+
+
+def accessed(directory: Path) -> float:
+    for path in (directory / ACCESS_MARKER, directory):
+        with suppress(FileNotFoundError):
+            return path.stat().st_mtime
+    return 0.0
+
+
+def measure(directory: Path) -> int:
+    try:
+        modified = directory.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+    cached = _sizes.get(directory)
+    if cached and cached[0] == modified:
+        return cached[1]
+
+    size = 0
+    for path in directory.rglob("*"):
+        with suppress(FileNotFoundError):
+            if path.is_file():
+                size += path.stat().st_size
+
+    _sizes[directory] = modified, size
+    return size
+
+
+def listing(directory: Path) -> dict[str, list[Path]]:
+    try:
+        modified = directory.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+
+    cached = _listings.get(directory)
+    if cached and cached[0] == modified:
+        return cached[1]
+
+    stems: dict[str, list[Path]] = defaultdict(list)
+    for path in directory.iterdir():
+        stems[path.stem].append(path)
+
+    _listings[directory] = modified, dict(stems)
+    return _listings[directory][1]
+
+
+def forget(directory: Path):
+    _listings.pop(directory, None)
+
+
+def scan(root: Path = settings.TEMPLATES_DIRECTORY) -> list[tuple[float, int, Path]]:
+    entries = []
+    for directory in root.glob("_custom-*"):
+        size = measure(directory) + measure(settings.IMAGES_DIRECTORY / directory.name)
+        entries.append((accessed(directory), size, directory))
+    for path in (settings.DOWNLOADS_DIRECTORY / "blobs").glob("*/*"):
+        with suppress(FileNotFoundError):
+            stat = path.stat()
+            # Blobs linked into a custom template are counted with that directory
+            if stat.st_nlink == 1:
+                entries.append((stat.st_mtime, stat.st_size, path))
+    entries.sort()
+    return entries
+
+
+def evict(
+    root: Path = settings.TEMPLATES_DIRECTORY,
+    *,
+    quota: int = settings.CUSTOM_TEMPLATES_QUOTA,
+    grace: float = settings.CUSTOM_TEMPLATES_GRACE,
+) -> list[Path]:
+    entries = scan(root)
+    total = sum(size for _accessed, size, _directory in entries)
+    logger.info(f"Custom templates use {total} of {quota} byte(s)")
+
+    evicted: list[Path] = []
+    now = time.time()
+    for last_access, size, directory in entries:
+        if total <= quota:
+            break
+        if directory in _active or now - last_access < grace:
+            continue
+        remove(directory)
+        total -= size
+        evicted.append(directory)
+
+    if evicted:
+        logger.warning(f"Evicted {len(evicted)} least recently used custom template(s)")
+    return evicted
+
+
+def maybe_evict(
+    root: Path = settings.TEMPLATES_DIRECTORY,
+    *,
+    interval: float = settings.CUSTOM_TEMPLATES_EVICTION_INTERVAL,
+) -> list[Path]:
+    global _evicted_at
+    now = time.time()
+    if now - _evicted_at < interval:
+        return []
+    _evicted_at = now
+    return evict(root)
+
+
+def remove(directory: Path):
+    if directory.is_file():
+        directory.unlink(missing_ok=True)
+        return
+
+    forget(directory)
+    for path in (directory, settings.IMAGES_DIRECTORY / directory.name):
+        _sizes.pop(path, None)
+        # Renaming is atomic, so concurrent readers see the whole directory or nothing
+        trash = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+        try:
+            path.rename(trash)
+        except FileNotFoundError:
+            continue
+        shutil.rmtree(trash, ignore_errors=True)
@@ -0,0 +1,130 @@
+import json
+import shutil
+import tempfile
+import uuid
+from contextlib import suppress
+from pathlib import Path
+
+from PIL import Image
+from sanic.log import logger
+
+from .. import settings
+from ..models import REGISTRY
+from . import images, text
+
+INDEX = "index.json"
+SPRITE = "sprite.jpg"
+FRAMES = 10
+
+_index: tuple[int, dict] = (0, {})
+
+
+def read(directory: Path | None = None) -> dict:
+    global _index
+    path = (directory or settings.EXAMPLES_DIRECTORY) / INDEX
+    try:
+        modified = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    if _index[0] != modified:
+        with suppress(ValueError):
+            _index = modified, json.loads(path.read_text())
+    return _index[1]
+
+
+def render(template, extension: str, directory: Path) -> Path:
+    lines = text.decode(text.encode(template.example))
+    with tempfile.TemporaryDirectory() as temporary:
+        path = images.save(
+            template,
+            lines,
+            extension=extension,
+            size=(settings.PREVIEW_SIZE[0], 0),
+            maximum_frames=FRAMES,
+            directory=Path(temporary),
+        )
+        destination = directory / f"{template.id}.{extension}"
+        shutil.move(path, destination)
+    return destination
+
+
+def build(directory: Path | None = None, *, sprite: bool = False) -> int:
+    directory = directory or settings.EXAMPLES_DIRECTORY
+    directory.mkdir(parents=True, exist_ok=True)
+    extensions = [
+        settings.DEFAULT_STATIC_EXTENSION,
+        settings.DEFAULT_ANIMATED_EXTENSION,
+    ]
+
+    thumbnails: dict[str, dict[str, str]] = {}
+    for template in REGISTRY.all():
+        try:
+            thumbnails[template.id] = {
+                extension: render(template, extension, directory).name
+                for extension in extensions
+            }
+        except images.EXCEPTIONS as e:
+            logger.error(f"Unable to render thumbnail for {template.id}: {e}")
+
+    index: dict = {"thumbnails": thumbnails}
+    if sprite:
+        index["sprite"] = build_sprite(directory, thumbnails)
+
+    path = directory / INDEX
+    temporary = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+    temporary.write_text(json.dumps(index))
+    temporary.replace(path)
+    return len(thumbnails)
+
+
+def build_sprite(directory: Path, thumbnails: dict[str, dict[str, str]]) -> dict:
+    width = settings.PREVIEW_SIZE[0]
+    columns = 10
+
+    tiles: list[tuple[str, Image.Image]] = []
+    for id, files in thumbnails.items():
+        image = Image.open(directory / files[settings.DEFAULT_STATIC_EXTENSION])
+        height = round(image.height * width / image.width)
+        tiles.append((id, image.resize((width, height))))
+
+    positions: dict[str, list[int]] = {}
+    x = y = row = 0
+    for index, (id, tile) in enumerate(tiles):
+        if index and index % columns == 0:
+            x, y, row = 0, y + row, 0
+        positions[id] = [x, y, tile.width, tile.height]
+        x += tile.width
+        row = max(row, tile.height)
+
+    sheet = Image.new("RGB", (width * columns, y + row), "white")
+    for id, tile in tiles:
+        x, y = positions[id][:2]
+        sheet.paste(tile.convert("RGB"), (x, y))
+    sheet.save(directory / SPRITE, quality=80)
+
+    return {"file": SPRITE, "size": list(sheet.size), "positions": positions}
+
+
+def lookup(items: list[tuple[str, str]]) -> tuple[dict[str, str], dict]:
+    index = read()
+    thumbnails = index.get("thumbnails", {})
+    positions = index.get("sprite", {}).get("positions", {})
+
+    sources: dict[str, str] = {}
+    tiles: dict[str, list[int]] = {}
+    for url, template in items:
+        id = template.rstrip("/").rsplit("/", 1)[-1]
+        extension = url.rsplit(".", 1)[-1]
+        if extension == settings.DEFAULT_STATIC_EXTENSION and id in positions:
+            tiles[url] = positions[id]
+        elif name := thumbnails.get(id, {}).get(extension):
+            sources[url] = f"/examples/thumbnails/{name}"
+
+    sprite = {}
+    if tiles:
+        sprite = {
+            "url": f"/examples/thumbnails/{index['sprite']['file']}",
+            "size": index["sprite"]["size"],
+            "positions": tiles,
+        }
+    return sources, sprite
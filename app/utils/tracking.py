@@ -0,0 +1,120 @@
+import asyncio
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass
+
+import aiohttp
+from sanic.log import logger
+
+from .. import settings
+from . import breakers
+from .http import EXCEPTIONS
+
+IGNORED_STATUSES = {414, 421, 520}
+
+
+@dataclass(frozen=True)
+class Event:
+    params: dict[str, str]
+    api_key: str = ""
+
+
+COUNTS = {"queued": 0, "sent": 0, "failed": 0, "dropped": 0}
+
+_queue: deque[Event] = deque()
+_worker: asyncio.Task | None = None
+_wakeup: asyncio.Event | None = None
+
+
+def enqueue(event: Event):
+    if len(_queue) >= settings.REMOTE_TRACKING_QUEUE_SIZE:
+        # Drop the oldest events so a slow tracker can't grow memory
+        _queue.popleft()
+        COUNTS["dropped"] += 1
+    _queue.append(event)
+    COUNTS["queued"] += 1
+
+    with suppress(RuntimeError):
+        start()
+        if _wakeup and len(_queue) >= settings.REMOTE_TRACKING_BATCH_SIZE:
+            _wakeup.set()
+
+
+def start():
+    global _worker, _wakeup
+    loop = asyncio.get_running_loop()
+    if _worker and not _worker.done() and _worker.get_loop() is loop:
+        return
+    _wakeup = asyncio.Event()
+    _worker = loop.create_task(_run(_wakeup))
+
+
+async def stop():
+    global _worker
+    if _worker:
+        _worker.cancel()
+        with suppress(asyncio.CancelledError):
+            await _worker
+        _worker = None
+    await flush()
+
+
+async def flush() -> int:
+    # The worker wakes up on every interval, usually with nothing to send
+    if not (_queue and settings.TRACK_REQUESTS):
+        return 0
+
+    count = 0
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(10)) as session:
+        while _queue and settings.TRACK_REQUESTS:
+            breaker = breakers.get("track")
+            if not breaker.allow():
+                break
+            size = min(len(_queue), settings.REMOTE_TRACKING_BATCH_SIZE)
+            if breaker.state == breakers.HALF_OPEN:
+                size = 1
+            batch = [_queue.popleft() for _ in range(size)]
+            try:
+                statuses = await asyncio.gather(*(_send(session, e) for e in batch))
+            except asyncio.CancelledError:
+                # Shutdown cancels the worker mid-batch, so stop() can send these
+                _queue.extendleft(reversed(batch))
+                breaker.release()
+                raise
+            count += len(batch)
+            _record(breaker, statuses)
+
+    if count:
+        logger.info(f"Flushed {count} tracking event(s): {COUNTS}")
+    return count
+
+
+async def _run(wakeup: asyncio.Event):
+    while True:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(
+                wakeup.wait(), settings.REMOTE_TRACKING_FLUSH_INTERVAL
+            )
+        wakeup.clear()
+        await flush()
+
+
+async def _send(session: aiohttp.ClientSession, event: Event) -> int:
+    api = settings.REMOTE_TRACKING_URL or ""
+    headers = {"X-API-KEY": event.api_key}
+    try:
+        async with session.get(api, params=event.params, headers=headers) as response:
+            if response.status != 200:
+                message = await response.text()
+                logger.error(f"Tracker response {response.status}: {message}")
+            return response.status
+    except EXCEPTIONS as e:
+        message = str(e).strip("() ") or e.__class__.__name__
+        logger.error(f"Tracker response 500: {message}")
+        return 500
+
+
+def _record(breaker: breakers.Breaker, statuses: list[int]):
+    for status in statuses:
+        COUNTS["sent" if status == 200 else "failed"] += 1
+        breaker.record(status < 404 or status in IGNORED_STATUSES)
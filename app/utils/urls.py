@@ -1,8 +1,11 @@
-from urllib.parse import unquote, urlencode
+import re
+from urllib.parse import parse_qs, unquote, urlencode
 
 from furl import furl
+from sanic.log import logger
 
 from .. import settings
+from . import signing, text
 
 FLAGS = {
     "0": False,
@@ -35,11 +38,31 @@ def flag(request, name, default=None):
     return FLAGS.get(value, default)
 
 
+def number(request, name, default=0) -> int:
+    try:
+        return max(0, int(request.args.get(name, default)))
+    except ValueError:
+        return default
+
+
+def names(request, name) -> tuple[str, ...]:
+    values = ",".join(request.args.getlist(name, []))
+    return tuple(value.strip() for value in values.split(",") if value.strip())
+
+
 def add(url: str, **kwargs):
     joiner = "&" if "?" in url else "?"
     return url + joiner + urlencode(kwargs)
 
 
+def resize(url: str, width: int) -> str:
+    resized = furl(url)
+    for name in ["width", "height", *signing.PARAMS]:
+        resized.args.pop(name, None)
+    resized.args["width"] = width
+    return clean(str(resized))
+
+
 def normalize(url: str) -> str:
     original = furl(url)
     normalized = furl(f"{settings.BASE_URL}{original.path}")
@@ -50,6 +73,39 @@ def normalize(url: str) -> str:
     return clean(str(normalized))
 
 
+def canonicalize(
+    template_id: str, text_paths: str, params: dict[str, list[str]]
+) -> tuple[str, str, dict[str, list[str]]]:
+    params = dict(params)
+
+    text_paths = clean(text_paths)
+    if "&" in text_paths:
+        logger.warning(f"Fixing query string: {text_paths}")
+        text_paths, query_string = text_paths.split("&", 1)
+        params.update(parse_qs(query_string))
+    elif "//" in text_paths:
+        logger.warning(f"Truncating path: {text_paths}")
+        text_paths = text_paths.split("//")[0]
+    elif text_paths.endswith(("/", '"')):
+        logger.warning(f"Fixing trailing characters: {text_paths}")
+        text_paths = text_paths.rstrip('/"')
+
+    if re.fullmatch(r"[^/].*\.\w+", text_paths):
+        text_paths, extension = text_paths.rsplit(".", 1)
+    else:
+        extension = settings.DEFAULT_STATIC_EXTENSION
+
+    if (
+        params.get("style") == ["animated"]
+        and extension not in settings.ANIMATED_EXTENSIONS
+    ):
+        params.pop("style")
+        extension = settings.DEFAULT_ANIMATED_EXTENSION
+
+    slug, _updated = text.normalize(text_paths)
+    return template_id, slug + "." + extension, params
+
+
 def params(**kwargs) -> dict:
     return {k: v for k, v in kwargs.items() if v}
 
@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+from contextlib import suppress
+
+from sanic.log import logger
+
+from .. import settings
+from ..models import REGISTRY, Font
+from . import images, pack
+
+STATUS: dict = {"ready": False}
+
+_lock = threading.Lock()
+
+
+def popular(limit: int) -> list[str]:
+    counts = []
+    for template in REGISTRY.all():
+        with suppress(FileNotFoundError):
+            with os.scandir(settings.IMAGES_DIRECTORY / template.id) as entries:
+                counts.append((-sum(1 for _entry in entries), template.id))
+                continue
+        counts.append((0, template.id))
+    counts.sort()
+    return [id for _count, id in counts[:limit]]
+
+
+def fonts() -> int:
+    default = Font.objects.get(settings.DEFAULT_FONT)
+    count = 0
+    for font in Font.objects.all():
+        # Text is fitted by trying every size, so only the default font gets them all
+        maximum = 100 if font == default else settings.MINIMUM_FONT_SIZE
+        for size in range(settings.MINIMUM_FONT_SIZE, maximum + 1):
+            images.load_font(str(font.path), size)
+            count += 1
+    return count
+
+
+def backgrounds(ids: list[str]) -> int:
+    count = 0
+    for id in ids:
+        template = REGISTRY.get(id)
+        if template:
+            try:
+                count += images.preload(template.image)
+            except images.EXCEPTIONS as e:
+                logger.error(e)
+    return count
+
+
+def examples(ids: list[str]) -> int:
+    count = 0
+    for id in ids:
+        template = REGISTRY.get(id)
+        if template:
+            extension = "gif" if template.animated_image else "png"
+            images.save(template, template.example, extension=extension)
+            count += 1
+    return count
+
+
+def blanks(ids: list[str]) -> int:
+    count = 0
+    for id in ids:
+        template = REGISTRY.get(id)
+        if template:
+            try:
+                images.blank(template)
+            except images.EXCEPTIONS as e:
+                logger.error(e)
+            else:
+                count += 1
+    return count
+
+
+def run(
+    *,
+    limit: int = settings.WARMUP_BACKGROUNDS,
+    render: bool = settings.WARMUP_EXAMPLES,
+) -> dict:
+    # Server restarts can overlap a warmup still running in another thread
+    with _lock:
+        if not STATUS["ready"]:
+            _run(limit, render)
+    return STATUS
+
+
+def _run(limit: int, render: bool):
+    started = time.perf_counter()
+    REGISTRY.refresh(force=True)
+    pack.get()
+
+    ids = popular(limit)
+    STATUS["templates"] = len(REGISTRY.all())
+    STATUS["fonts"] = fonts()
+    STATUS["backgrounds"] = backgrounds(ids)
+    STATUS["blanks"] = blanks(ids) if render else 0
+    STATUS["examples"] = examples(ids) if render else 0
+    STATUS["duration"] = round(time.perf_counter() - started, 3)
+    STATUS["ready"] = True
+
+    logger.info(f"Warmed up in {STATUS['duration']} second(s): {STATUS}")
@@ -1,7 +1,7 @@
 import asyncio
 import random
 
-from sanic import Blueprint, response
+from sanic import Blueprint, exceptions, response
 from sanic.request import Request
 from sanic_ext import openapi
 
@@ -31,6 +31,15 @@ async def examples_static(request: Request):
     return display(request, items)
 
 
+@blueprint.get("/thumbnails/<filename:path>")
+@openapi.exclude(True)
+async def thumbnail(request: Request, filename: str):
+    path = settings.EXAMPLES_DIRECTORY / filename
+    if path.parent != settings.EXAMPLES_DIRECTORY or not path.is_file():
+        raise exceptions.NotFound(f"Thumbnail not found: {filename}")
+    return await response.file(path, headers={"Cache-Control": "public, max-age=86400"})
+
+
 def display(request, items):
     urls = [items[0] for items in items]
     if settings.DEBUG:
@@ -38,5 +47,8 @@ def display(request, items):
     else:
         refresh = 0
         random.shuffle(urls)
-    content = utils.html.gallery(urls, columns=True, refresh=refresh)
+    thumbnails, sprite = utils.thumbnails.lookup(items)
+    content = utils.html.gallery(
+        urls, columns=True, refresh=refresh, thumbnails=thumbnails, sprite=sprite
+    )
     return response.html(content)
@@ -2,7 +2,7 @@ from sanic import Blueprint, exceptions, response
 from sanic.request import Request
 from sanic_ext import openapi
 
-from .. import models
+from .. import models, utils
 from .schemas import FontResponse
 
 blueprint = Blueprint("Fonts", url_prefix="/fonts")
@@ -16,9 +16,10 @@ blueprint = Blueprint("Fonts", url_prefix="/fonts")
     "Successfully returned a list of fonts",
 )
 async def index(request: Request):
-    fonts = models.Font.objects.all()
-    data = [font.jsonify(request) for font in fonts]
-    return response.json(data)
+    return await utils.responses.json(
+        request,
+        build=lambda: [font.jsonify(request) for font in models.Font.objects.all()],
+    )
 
 
 @blueprint.get("/<id:slug>")
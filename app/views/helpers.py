@@ -1,9 +1,11 @@
 import asyncio
 from contextlib import suppress
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
 
 from sanic import exceptions, response
 from sanic.log import logger
-from sanic.request import Request
+from sanic.request import Request, RequestParameters
 
 from .. import models, settings, utils
 
@@ -91,6 +93,9 @@ async def generate_url(
     url, _updated = await utils.meta.tokenize(request, url)
 
     logger.info(f"Generated image: {payload} => {url}")
+    if status < 400:
+        watermark, _updated = await utils.meta.get_watermark(request)
+        prerender(url, url, watermark)
 
     if payload.get("redirect", False):
         return response.redirect(utils.urls.add(url, status="201"))
@@ -109,7 +114,7 @@ async def preview_image(request: Request, id: str, style: str, lines: list[str])
             template = models.Template.objects.get("_error")
             error = "Invalid Background"
     else:
-        template = models.Template.objects.get_or_none(id)
+        template = models.REGISTRY.get(id) or models.Template.objects.get_or_none(id)
         if not template:
             logger.error(f"No such template: {id}")
             template = models.Template.objects.get("_error")
@@ -135,22 +140,152 @@ async def preview_image(request: Request, id: str, style: str, lines: list[str])
     data, content_type = await asyncio.to_thread(
         utils.images.preview, template, lines, style=style, watermark=watermark
     )
+    if settings.PRERENDER and not error:
+        # Editing sessions usually end by rendering the last preview
+        layout = request.args.get("layout", "")
+        if utils.urls.schema(id):
+            url = models.Template("_custom").build_custom_url(
+                request, list(lines), background=id, style=style, layout=layout
+            )
+        else:
+            url = template.build_custom_url(
+                request, list(lines), style=style, layout=layout
+            )
+        watermark, _updated = await utils.meta.get_watermark(request)
+        prerender(f"preview:{request.ip}:{id}", url, watermark)
     return response.raw(data, content_type=content_type)
 
 
+async def get_canonical_url(
+    request: Request, template_id: str, text_paths: str
+) -> tuple[str, int]:
+    template_id, text_filepath, params = utils.urls.canonicalize(
+        template_id, text_paths, dict(request.args)
+    )
+    _watermark, updated = await utils.meta.get_watermark(request)
+    return await build_canonical_url(
+        request, template_id, text_filepath, params, updated=updated
+    )
+
+
+async def build_canonical_url(
+    request: Request,
+    template_id: str,
+    text_filepath: str,
+    params: dict[str, list[str]],
+    *,
+    updated: bool,
+) -> tuple[str, int]:
+    path = f"/images/{template_id}/{text_filepath}"
+    changed = unquote(request.path) != path or params != dict(request.args)
+    status = 301
+
+    if updated:
+        params = {k: v for k, v in params.items() if k != "watermark"}
+        changed = True
+        status = 302
+
+    url = request.app.url_for(
+        "Images.detail_text",
+        template_id=template_id,
+        text_filepath=text_filepath,
+        **params,
+    )
+    url = utils.urls.clean(url)
+
+    absolute = f"{request.scheme}://{request.host}{url}" if changed else request.url
+    tokenized_url, updated = await utils.meta.tokenize(request, absolute)
+    if updated:
+        return tokenized_url, 302
+    if changed:
+        return url, status
+    return "", 200
+
+
 async def render_image(
     request: Request,
     id: str,
     slug: str = "",
     watermark: str = "",
     extension: str = settings.DEFAULT_STATIC_EXTENSION,
+    *,
+    args: dict | None = None,
 ):
     logger.info(f"Rendering image: {request.url}")
+    path, status = await save_image(
+        request.args if args is None else args,
+        id,
+        slug,
+        watermark,
+        extension,
+        request=request,
+    )
+    mime_type = "image/webp" if path.suffix == ".webp" else None
+    return await response.file(path, status, mime_type=mime_type)
+
+
+async def render_blank(request: Request, id: str, extension: str):
+    template = models.REGISTRY.get(id)
+    style = request.args.get("style") or "default"
+    if (
+        settings.DEBUG
+        or not template
+        or extension in settings.ANIMATED_EXTENSIONS
+        or extension not in settings.ALLOWED_EXTENSIONS
+        or not set(request.args) <= {"style", "width", "height"}
+        or style not in {"default", *template.styles} - {"animated"}
+    ):
+        return None
+
+    try:
+        size = int(request.args.get("width", 0)), int(request.args.get("height", 0))
+    except ValueError:
+        return None
+    if 0 < size[0] < 10 or 0 < size[1] < 10 or not template.image.exists():
+        return None
 
+    path = await asyncio.to_thread(utils.images.blank, template, style, extension, size)
+    return await response.file(path)
+
+
+def prerender(key: str, url: str, watermark: str):
+    # The watermark is resolved from the requesting client, never the URL alone
+    if not settings.PRERENDER:
+        return
+
+    parts = urlsplit(url)
+    try:
+        path = unquote(parts.path).removeprefix("/images/")
+        template_id, text_paths = path.split("/", 1)
+    except ValueError:
+        logger.warning(f"Unable to pre-render URL: {url}")
+        return
+    template_id, text_filepath, params = utils.urls.canonicalize(
+        template_id, text_paths, parse_qs(parts.query)
+    )
+    slug, extension = text_filepath.rsplit(".", 1)
+    args = RequestParameters(params)
+
+    async def job():
+        logger.info(f"Pre-rendering image: {url}")
+        await save_image(args, template_id, slug, watermark, extension)
+
+    utils.prerender.enqueue(key, job)
+
+
+async def save_image(
+    args: dict,
+    id: str,
+    slug: str = "",
+    watermark: str = "",
+    extension: str = settings.DEFAULT_STATIC_EXTENSION,
+    *,
+    request: Request | None = None,
+) -> tuple[Path, int]:
     lines = utils.text.decode(slug)
-    status = int(utils.urls.arg(request.args, "200", "status"))
-    frames = int(request.args.get("frames", 0))
-    style = utils.urls.arg(request.args, "default", "style")
+    status = int(utils.urls.arg(args, "200", "status"))
+    frames = int(args.get("frames", 0))
+    style = utils.urls.arg(args, "default", "style")
 
     animated = extension in settings.ANIMATED_EXTENSIONS
     if extension not in settings.ALLOWED_EXTENSIONS:
@@ -168,7 +303,7 @@ async def render_image(
         status = 414
 
     elif id == "custom":
-        url = utils.urls.arg(request.args, None, "background")
+        url = utils.urls.arg(args, None, "background")
         if url:
             url = utils.urls.clean(url)
             template = await models.Template.create(url)
@@ -183,7 +318,7 @@ async def render_image(
             style = "default"
             status = 422
     else:
-        template = models.Template.objects.get_or_none(id)
+        template = models.REGISTRY.get(id) or models.Template.objects.get_or_none(id)
         if not template or not template.image.exists():
             logger.error(f"No such template: {id}")
             template = models.Template.objects.get("_error")
@@ -191,9 +326,7 @@ async def render_image(
                 status = 404
 
     if status < 400:
-        template = await template.clone(
-            request.args, len(lines), style, animated=animated
-        )
+        template = await template.clone(args, len(lines), style, animated=animated)
         if not await template.check(style, animated=animated):
             if utils.urls.schema(style):
                 status = 415
@@ -201,7 +334,7 @@ async def render_image(
                 logger.error(f"Invalid style: {style}")
                 status = 422
 
-    font_name = utils.urls.arg(request.args, "", "font")
+    font_name = utils.urls.arg(args, "", "font")
     if font_name == settings.PLACEHOLDER:
         font_name = ""
     else:
@@ -213,7 +346,7 @@ async def render_image(
             status = 422
 
     try:
-        size = int(request.args.get("width", 0)), int(request.args.get("height", 0))
+        size = int(args.get("width", 0)), int(args.get("height", 0))
         if 0 < size[0] < 10 or 0 < size[1] < 10:
             raise ValueError(f"Dimensions are too small: {size}")
     except ValueError as e:
@@ -221,19 +354,19 @@ async def render_image(
         size = 0, 0
         status = 422
 
-    if status < 400:
-        asyncio.create_task(utils.meta.track(request, lines))
+    if status < 400 and request:
+        utils.meta.track(request, lines)
 
-    path = await asyncio.to_thread(
-        utils.images.save,
-        template,
-        lines,
-        watermark,
-        font_name=font_name,
-        extension=extension,
-        style=style,
-        size=size,
-        maximum_frames=frames,
-    )
-    mime_type = "image/webp" if path.suffix == ".webp" else None
-    return await response.file(path, status, mime_type=mime_type)
+    with utils.storage.using(template.directory):
+        path = await asyncio.to_thread(
+            utils.images.save,
+            template,
+            lines,
+            watermark,
+            font_name=font_name,
+            extension=extension,
+            style=style,
+            size=size,
+            maximum_frames=frames,
+        )
+    return path, status
@@ -2,11 +2,12 @@ import asyncio
 
 from sanic import Blueprint, exceptions, response
 from sanic.log import logger
-from sanic.request import Request
+from sanic.request import Request, RequestParameters
 from sanic_ext import openapi
 
 from .. import helpers, settings, utils
-from .helpers import render_image
+from ..models import REGISTRY
+from .helpers import build_canonical_url, render_blank, render_image
 from .schemas import (
     AutomaticRequest,
     CustomRequest,
@@ -14,6 +15,7 @@ from .schemas import (
     ExampleResponse,
     MemeRequest,
     MemeResponse,
+    SrcsetResponse,
 )
 from .templates import generate_url
 
@@ -32,9 +34,16 @@ blueprint = Blueprint("Images", url_prefix="/images")
 )
 async def index(request: Request):
     query = request.args.get("filter", "").lower()
-    examples = await asyncio.to_thread(helpers.get_example_images, request, query)
-    return response.json(
-        [{"url": url, "template": template} for url, template in examples]
+    animated = utils.urls.flag(request, "animated")
+    return await utils.responses.json(
+        request,
+        query,
+        animated,
+        build=lambda: [
+            {"url": url, "template": template}
+            for url, template in helpers.get_example_images(request, query)
+        ],
+        version=REGISTRY.version,
     )
 
 
@@ -132,15 +141,55 @@ async def index_custom(request: Request):
     if not results:
         return response.json({"message": f"No results matched: {query}"}, status=404)
 
-    items = []
-    for result in results:
-        url = utils.urls.normalize(result["image_url"])
-        url, _updated = await utils.meta.tokenize(request, url)
-        items.append({"url": url})
+    urls = await asyncio.gather(
+        *(
+            utils.meta.tokenize(request, utils.urls.normalize(result["image_url"]))
+            for result in results
+        )
+    )
+    items = [{"url": url} for url, _updated in urls]
 
     return response.json(items, status=200)
 
 
+@blueprint.get("/srcset")
+@openapi.exclude(not settings.SIZE_BUCKETS)
+@openapi.summary("List responsive sizes of a meme")
+@openapi.parameter("url", str, "query", description="URL of a meme image")
+@openapi.response(
+    200,
+    {"application/json": SrcsetResponse},
+    "Successfully returned an image URL for each size",
+)
+@openapi.response(
+    400, {"application/json": ErrorResponse}, 'Required "url" missing in query'
+)
+async def srcset(request: Request):
+    if not settings.SIZE_BUCKETS:
+        return response.json({"error": "Size buckets are disabled"}, status=404)
+    url = request.args.get("url")
+    if not url:
+        return response.json({"error": '"url" is required'}, status=400)
+
+    urls = await asyncio.gather(
+        *(
+            utils.meta.tokenize(request, utils.urls.resize(url, width))
+            for width in settings.SIZE_BUCKETS
+        )
+    )
+    items = [
+        {"url": resized, "width": width}
+        for (resized, _updated), width in zip(urls, settings.SIZE_BUCKETS)
+    ]
+
+    return response.json(
+        {
+            "srcset": ", ".join(f"{item['url']} {item['width']}w" for item in items),
+            "images": items,
+        }
+    )
+
+
 @blueprint.get(r"/<template_filename:.+\.\w+>")
 @openapi.summary("Display a template background")
 @openapi.parameter(
@@ -175,6 +224,10 @@ async def detail_blank(request: Request, template_filename: str):
         )
         return response.redirect(utils.urls.clean(url), status=301)
 
+    blank = await render_blank(request, template_id, extension)
+    if blank:
+        return blank
+
     return await render_image(request, template_id, extension=extension)
 
 
@@ -197,46 +250,22 @@ async def detail_blank(request: Request, template_filename: str):
     "Invalid style for template or no image URL specified for custom template",
 )
 async def detail_text(request: Request, template_id: str, text_filepath: str):
-    text_paths, extension = text_filepath.rsplit(".", 1)
-
-    if (
-        request.args.get("style") == "animated"
-        and extension not in settings.ANIMATED_EXTENSIONS
-    ):
-        # TODO: Move this pattern to utils
-        params = {k: v for k, v in request.args.items() if k != "style"}
-        url = request.app.url_for(
-            "Images.detail_text",
-            template_id=template_id,
-            text_filepath=text_paths + ".gif",
-            **params,
-        )
-        return response.redirect(utils.urls.clean(url), status=301)
-
-    slug, updated = utils.text.normalize(text_paths)
-    if updated:
-        url = request.app.url_for(
-            "Images.detail_text",
-            template_id=template_id,
-            text_filepath=slug + "." + extension,
-            **request.args,
-        )
-        return response.redirect(utils.urls.clean(url), status=301)
-
-    url, updated = await utils.meta.tokenize(request, request.url)
-    if updated:
-        return response.redirect(url, status=302)
-
+    template_id, text_filepath, params = utils.urls.canonicalize(
+        template_id, text_filepath, dict(request.args)
+    )
     watermark, updated = await utils.meta.get_watermark(request)
-    if updated:
-        # TODO: Move this pattern to utils
-        params = {k: v for k, v in request.args.items() if k != "watermark"}
-        url = request.app.url_for(
-            "Images.detail_text",
-            template_id=template_id,
-            text_filepath=slug + "." + extension,
-            **params,
-        )
-        return response.redirect(utils.urls.clean(url), status=302)
-
-    return await render_image(request, template_id, slug, watermark, extension)
+    url, status = await build_canonical_url(
+        request, template_id, text_filepath, params, updated=updated
+    )
+    if url and (status != 301 or settings.CANONICAL_REDIRECTS):
+        return response.redirect(url, status=status)
+
+    slug, extension = text_filepath.rsplit(".", 1)
+    # Parameters fixed from the path only exist in the canonical copy
+    args = RequestParameters(params)
+    image = await render_image(
+        request, template_id, slug, watermark, extension, args=args
+    )
+    if url:
+        image.headers["Content-Location"] = url
+    return image
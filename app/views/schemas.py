@@ -63,6 +63,18 @@ class MemeResponse:
     url: str
 
 
+@dataclass
+class _Rendition:
+    url: str
+    width: int
+
+
+@dataclass
+class SrcsetResponse:
+    srcset: str
+    images: list[_Rendition]
+
+
 @dataclass
 class ExampleResponse:
     url: str
@@ -1,10 +1,9 @@
-from urllib.parse import parse_qs
-
 from sanic import Blueprint, exceptions, response
 from sanic.log import logger
 from sanic_ext import openapi
 
 from .. import models, settings, utils
+from .helpers import get_canonical_url
 
 blueprint = Blueprint("Shortcuts", url_prefix="/")
 
@@ -81,22 +80,7 @@ async def custom_path(request, template_id, text_paths):
     if template_id == "images":
         return response.redirect(f"/images/{text_paths}".removesuffix("/"))
 
-    params = {}
     text_paths = utils.urls.clean(text_paths)
-    if "&" in text_paths:
-        logger.warning(f"Fixing query string: {text_paths}")
-        text_paths, query_string = text_paths.split("&", 1)
-        params = parse_qs(query_string)
-    elif "//" in text_paths:
-        logger.warning(f"Truncating path: {text_paths}")
-        text_paths = text_paths.split("//")[0]
-    elif text_paths.endswith("/"):
-        logger.warning(f"Fixing trailing slash: {text_paths}")
-        text_paths = text_paths.rstrip("/")
-    elif text_paths.endswith('"'):
-        logger.warning(f"Fixing trailing quote: {text_paths}")
-        text_paths = text_paths.rstrip('"')
-
     if text_paths.startswith("."):
         return response.redirect(
             request.app.url_for(
@@ -105,27 +89,12 @@ async def custom_path(request, template_id, text_paths):
             )
         )
 
-    try:
-        url = request.app.url_for(
-            "Images.detail_text",
-            template_id=template_id,
-            text_filepath=text_paths,
-            **params,
-        )
-    except exceptions.URLBuildError as e:
-        if "text_filepath" in str(e):
-            logger.warning(f"Handing missing extension: {e}")
-        else:
-            raise
-        url = request.app.url_for(
-            "Images.detail_text",
-            template_id=template_id,
-            text_filepath=text_paths + settings.DEFAULT_SUFFIX,
-            **params,
-        )
-
     if not settings.DEBUG:
-        return response.redirect(url)
+        url, status = await get_canonical_url(request, template_id, text_paths)
+        return response.redirect(url, status=status)
+
+    _id, text_filepath, _params = utils.urls.canonicalize(template_id, text_paths, {})
+    text_paths = text_filepath.rsplit(".", 1)[0]
 
     template = models.Template.objects.get_or_create(template_id)
     template.datafile.save()
@@ -153,15 +122,10 @@ async def custom_path(request, template_id, text_paths):
 @openapi.response(302, {"image/*": bytes}, "Successfully redirected to a custom image")
 @openapi.response(404, {"text/html": str}, description="Template not found")
 async def legacy_custom_image(request, template_id, text_paths):
-    text_paths, extension = text_paths.rsplit(".", 1)
     template = models.Template.objects.get_or_none(template_id)
     if template:
-        url = request.app.url_for(
-            "Images.detail_text",
-            template_id=template_id,
-            text_filepath=text_paths + "." + extension,
-        )
-        return response.redirect(url)
+        url, status = await get_canonical_url(request, template_id, text_paths)
+        return response.redirect(url, status=status)
     raise exceptions.NotFound(f"Template not found: {template_id}")
 
 
@@ -175,4 +139,5 @@ async def legacy_custom_image(request, template_id, text_paths):
 async def legacy_custom_path(request, template_id, text_paths):
     if template_id == "images":
         return response.redirect(f"/images/{text_paths}".removesuffix("/"))
-    return response.redirect(f"/images/{template_id}/{text_paths}")
+    url, status = await get_canonical_url(request, template_id, text_paths)
+    return response.redirect(url, status=status)
@@ -1,11 +1,9 @@
-import asyncio
-
 from sanic import Blueprint, exceptions, response
 from sanic.request import Request
 from sanic_ext import openapi
 
 from .. import helpers, utils
-from ..models import Template
+from ..models import REGISTRY, Template
 from .helpers import generate_url
 from .schemas import CustomRequest, MemeResponse, MemeTemplateRequest, TemplateResponse
 
@@ -23,6 +21,17 @@ blueprint = Blueprint("Templates", url_prefix="/templates")
 @openapi.parameter(
     "filter", str, "query", description="Part of the name, keyword, or example to match"
 )
+@openapi.parameter(
+    "fields", str, "query", description="Comma-separated list of fields to include"
+)
+@openapi.parameter(
+    "compact", bool, "query", description="Only include ID, name, lines, and styles"
+)
+@openapi.parameter("limit", int, "query", description="Maximum number of results")
+@openapi.parameter("offset", int, "query", description="Number of results to skip")
+@openapi.parameter(
+    "cursor", str, "query", description="ID of the last template on the prior page"
+)
 @openapi.response(
     200,
     {"application/json": list[TemplateResponse]},
@@ -31,10 +40,31 @@ blueprint = Blueprint("Templates", url_prefix="/templates")
 async def index(request: Request):
     query = request.args.get("filter", "").lower()
     animated = utils.urls.flag(request, "animated")
-    data = await asyncio.to_thread(
-        helpers.get_valid_templates, request, query, animated
+    fields: tuple[str, ...] = utils.urls.names(request, "fields")
+    if utils.urls.flag(request, "compact"):
+        fields = helpers.COMPACT_FIELDS
+    offset = utils.urls.number(request, "offset")
+    limit = utils.urls.number(request, "limit")
+    cursor = request.args.get("cursor", "")
+    return await utils.responses.page(
+        request,
+        query,
+        animated,
+        fields,
+        offset,
+        limit,
+        cursor,
+        build=lambda: helpers.get_valid_templates(
+            request,
+            query,
+            animated,
+            fields=fields,
+            offset=offset,
+            limit=limit,
+            cursor=cursor,
+        ),
+        version=REGISTRY.version,
     )
-    return response.json(data)
 
 
 @blueprint.get("/<id:slug>")
@@ -47,7 +77,7 @@ async def index(request: Request):
 )
 @openapi.response(404, str, description="Template not found")
 async def detail(request, id):
-    template: Template = Template.objects.get_or_none(id)
+    template = REGISTRY.get(id) or Template.objects.get_or_none(id)
     if template:
         return response.json(template.jsonify(request))
     raise exceptions.NotFound(f"Template not found: {id}")
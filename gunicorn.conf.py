@@ -0,0 +1,6 @@
+from app.utils import warmup
+
+
+def when_ready(server):
+    # Runs in the master after preloading, so forked workers start warm
+    warmup.run()
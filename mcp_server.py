@@ -225,22 +225,26 @@ async def handle_list_templates(client: httpx.AsyncClient, args: dict) -> list[T
     if "animated" in args:
         params["animated"] = "1" if args["animated"] else "0"
     
+    params["fields"] = "id,name,lines,styles,example"
+    params["limit"] = "50"  # Limit to 50 to avoid overwhelming output
+    
     response = await client.get(f"{MEMEGEN_BASE_URL}/templates/", params=params)
     response.raise_for_status()
     
     templates = response.json()
+    total = int(response.headers.get("X-Total-Count", len(templates)))
     
     # Format the response
-    result = f"Found {len(templates)} template(s):\n\n"
-    for template in templates[:50]:  # Limit to 50 to avoid overwhelming output
+    result = f"Found {total} template(s):\n\n"
+    for template in templates:
         result += f"• **{template['name']}** (ID: `{template['id']}`)\n"
         result += f"  Lines: {template['lines']}"
         if template.get('styles'):
             result += f" | Styles: {', '.join(template['styles'])}"
         result += f"\n  Example: {template['example']['url']}\n\n"
     
-    if len(templates) > 50:
-        result += f"... and {len(templates) - 50} more templates.\n"
+    if total > len(templates):
+        result += f"... and {total - len(templates)} more templates.\n"
         result += "Use the 'filter' parameter to narrow down results.\n"
     
     return [TextContent(type="text", text=result)]
@@ -0,0 +1,19 @@
+"""
+poetry run python -m scripts.build_pack [destination]
+"""
+
+import sys
+from pathlib import Path
+
+from app import settings
+from app.utils import pack
+
+
+def main():
+    destination = Path(sys.argv[1]) if len(sys.argv) > 1 else settings.PACK_PATH
+    count = pack.build(destination)
+    print(f"Packed {count} background(s) into {destination}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""
+poetry run python -m scripts.build_thumbnails [--sprite]
+"""
+
+import sys
+
+from app import settings, utils
+
+
+def main():
+    count = utils.thumbnails.build(sprite="--sprite" in sys.argv)
+    print(f"Rendered {count} thumbnail(s) into {settings.EXAMPLES_DIRECTORY}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+poetry run python -m scripts.ingest_templates [template_id ...]
+"""
+
+import sys
+
+from app import settings, utils
+from app.models import Template
+
+
+def main():
+    ids = sys.argv[1:] or sorted(
+        path.parent.name for path in settings.TEMPLATES_DIRECTORY.glob("*/config.yml")
+    )
+    failures = 0
+    for id in ids:
+        template = Template.objects.get_or_none(id)
+        if not template or not template.valid or not template.image.exists():
+            if not id.startswith("_"):
+                print(f"Invalid template: {id}")
+                failures += 1
+            continue
+        count = utils.renditions.build(template.directory)
+        print(f"Wrote {count} rendition(s) for {id}")
+    sys.exit(failures)
+
+
+if __name__ == "__main__":
+    main()